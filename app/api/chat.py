@@ -1,9 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 import time
+import threading
 from ..core.chat_engine import ChatEngine
-from ..core.vector_store import VectorStore
+from ..core.tenants import TenantNotFound, get_tenant_registry
+from ..core.reranker import rerank, load_reranker
+from ..core.query_expansion import QueryExpander
+from ..core.singleflight import SingleFlight, normalize_question
+from ..core.admission import AdmissionRejected, get_admission_controller
+from ..core.retrieval_cache import get_query_embedding_cache, get_retrieval_cache
 from ..core.config import get_settings
 
 settings = get_settings()
@@ -13,19 +20,60 @@ router = APIRouter(prefix="/chat")
 class QuestionRequest(BaseModel):
     question: str
     context_count: int = 5
+    rerank: bool = False
+    rerank_candidates: Optional[int] = None  # 기본값: settings.rerank_candidates
+    rerank_top_n: Optional[int] = None  # 기본값: settings.rerank_top_n
+    multi_query: bool = False
+    response_mode: str = "full"  # "full": 청크 전문 반환, "compact": 청크 참조와 요약만 반환
+    tenant: Optional[str] = None  # 대리점 채널/상품군별 인덱스 (기본값: settings.default_tenant)
+
+class PrefetchRequest(BaseModel):
+    question: str  # 입력 중인 질문 (UI에서 debounce 후 전송)
+    context_count: int = 5
+    rerank: bool = False
+    rerank_candidates: Optional[int] = None
+    multi_query: bool = False
+    tenant: Optional[str] = None
+
+class PrefetchResponse(BaseModel):
+    status: str  # "warmed": 검색 완료, "cached": 이미 캐시됨, "skipped": 입력이 짧거나 서버가 혼잡해 생략
+    chunk_ids: List[str] = []
+    processing_time: int
+
+class ContextRef(BaseModel):
+    chunk_id: str
+    source: Optional[str] = None
+    page: Optional[int] = None
+    article: Optional[str] = None
+    snippet: str
 
 class ChatResponse(BaseModel):
     answer: str
     contexts: List[str]
     confidence: float
     processing_time: int
+    timings: Dict[str, int] = {}
+    usage: Dict[str, int] = {}
+    context_refs: List[ContextRef] = []
+
+class ChunkResponse(BaseModel):
+    chunk_id: str
+    content: str
+    metadata: Dict[str, Any]
 
 # 싱글톤 인스턴스
 chat_engine = ChatEngine()
-vector_store = VectorStore(
+tenants = get_tenant_registry()
+reranker = load_reranker(settings.reranker_model)
+query_expander = QueryExpander(
     openai_api_key=settings.openai_api_key,
-    collection_name="insurance_docs"
+    model_name=settings.query_expansion_model
 )
+question_flight = SingleFlight()
+retrieval_cache = get_retrieval_cache()
+admission = get_admission_controller()
+token_totals = {"prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0}
+token_totals_lock = threading.Lock()  # answer_question은 여러 스레드풀 스레드에서 동시에 실행됨
 
 @router.post("/question", response_model=ChatResponse)
 async def process_question(request: QuestionRequest):
@@ -45,39 +93,262 @@ async def process_question(request: QuestionRequest):
                 detail="context_count는 1-10 사이의 값이어야 합니다."
             )
         
-        # 유사한 컨텍스트 검색
-        context_docs = vector_store.similarity_search(
-            query=request.question,
-            k=request.context_count
-        )
+        if request.rerank_top_n is not None and not 1 <= request.rerank_top_n <= 10:
+            raise HTTPException(
+                status_code=400,
+                detail="rerank_top_n은 1-10 사이의 값이어야 합니다."
+            )
+        
+        if request.response_mode not in ("full", "compact"):
+            raise HTTPException(
+                status_code=400,
+                detail="response_mode는 'full' 또는 'compact'여야 합니다."
+            )
+        
+        # 테넌트 확인 (인덱스가 없으면 404)
+        request.tenant = resolve_tenant(request.tenant)
+        
+        # 0도 범위 검사를 받도록 None일 때만 기본값 사용
+        candidate_count = settings.rerank_candidates if request.rerank_candidates is None else request.rerank_candidates
+        top_n = min(request.context_count, settings.rerank_top_n if request.rerank_top_n is None else request.rerank_top_n)
         
-        # GPT 응답 생성
-        response = chat_engine.generate_answer(
-            question=request.question,
-            context_docs=context_docs
+        if request.rerank and (candidate_count < top_n or candidate_count > 50):
+            raise HTTPException(
+                status_code=400,
+                detail="rerank_candidates는 최종 컨텍스트 수 이상, 50 이하의 값이어야 합니다."
+            )
+        
+        # 동일한 질문/파라미터로 진행 중인 요청이 있으면 그 결과를 공유
+        flight_key = (
+            request.tenant,
+            normalize_question(request.question),
+            request.context_count,
+            request.rerank,
+            request.multi_query,
+            candidate_count if request.rerank else None,
+            top_n if request.rerank else None,
         )
+        async def compute():
+            # 전역 동시 LLM 호출 수 제한 (병합된 요청은 슬롯을 추가로 차지하지 않음)
+            async with admission.llm_slot():
+                return await run_in_threadpool(answer_question, request, top_n)
+        
+        result, shared = await question_flight.do(flight_key, compute)
+        
+        timings = dict(result["timings"])
+        if shared:
+            timings["coalesced"] = 1
         
         # 처리 시간 계산 (밀리초)
         processing_time = int((time.time() - start_time) * 1000)
         
-        # 신뢰도 계산 개선 (컨텍스트 유사도 기반)
-        confidence = calculate_confidence(context_docs, request.question)
+        # compact 모드는 청크 전문 대신 참조 정보만 반환 (전문은 /chat/chunks/{chunk_id}로 조회)
+        compact = request.response_mode == "compact"
         
         return ChatResponse(
-            answer=response["answer"],
-            contexts=response["contexts"],
-            confidence=confidence,
-            processing_time=processing_time
+            answer=result["answer"],
+            contexts=[] if compact else result["contexts"],
+            confidence=result["confidence"],
+            processing_time=processing_time,
+            timings=timings,
+            usage=result["usage"],
+            context_refs=result["context_refs"] if compact else []
         )
     
     except HTTPException:
         raise
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail="서버가 혼잡합니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(max(1, int(e.retry_after)))}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing question: {str(e)}"
         )
 
+@router.post("/prefetch", response_model=PrefetchResponse)
+async def prefetch(request: PrefetchRequest):
+    """입력 중인 질문으로 질의 임베딩/검색 캐시를 미리 채우고 후보 청크 ID를 반환합니다.
+    이후 같은 질문의 /chat/question 요청은 캐시된 검색 결과를 사용합니다."""
+    start_time = time.time()
+    
+    if request.context_count < 1 or request.context_count > 10:
+        raise HTTPException(
+            status_code=400,
+            detail="context_count는 1-10 사이의 값이어야 합니다."
+        )
+    if request.rerank and not 1 <= retrieval_k(request) <= 50:
+        raise HTTPException(
+            status_code=400,
+            detail="rerank_candidates는 1-50 사이의 값이어야 합니다."
+        )
+    request.tenant = resolve_tenant(request.tenant)
+    
+    def respond(status: str, docs: List = ()) -> PrefetchResponse:
+        return PrefetchResponse(
+            status=status,
+            chunk_ids=[doc.metadata.get("chunk_id", "") for doc in docs],
+            processing_time=int((time.time() - start_time) * 1000)
+        )
+    
+    if len(normalize_question(request.question)) < settings.prefetch_min_chars:
+        return respond("skipped")
+    
+    search_k = retrieval_k(request)
+    cached = retrieval_cache.get(retrieval_key(request, search_k))
+    if cached is not None:
+        return respond("cached", cached)
+    
+    # 프리페치는 대기하지 않으며, 한도 초과나 질문 요청 대기 중에는 건너뛰어 실제 요청을 방해하지 않음
+    try:
+        async with admission.prefetch_slot():
+            docs, _ = await run_in_threadpool(retrieve, request, search_k)
+    except AdmissionRejected:
+        return respond("skipped")
+    
+    return respond("warmed", docs)
+
+@router.get("/chunks/{chunk_id}", response_model=ChunkResponse)
+async def get_chunk(chunk_id: str, tenant: Optional[str] = None):
+    """청크 전문 조회 (compact 응답의 context_refs에서 사용)"""
+    tenant = resolve_tenant(tenant)
+    
+    def lookup():
+        with tenants.acquire(tenant) as vector_store:
+            return vector_store.get_chunk(chunk_id)
+    
+    chunk = await run_in_threadpool(lookup)
+    if chunk is None:
+        raise HTTPException(
+            status_code=404,
+            detail="해당 청크를 찾을 수 없습니다."
+        )
+    return ChunkResponse(
+        chunk_id=chunk_id,
+        content=chunk.page_content,
+        metadata=chunk.metadata
+    )
+
+@router.get("/metrics")
+async def get_metrics():
+    """요청 병합(single-flight), 부하 제어, 테넌트 인덱스, 캐시, 토큰 사용량 통계 조회"""
+    with token_totals_lock:
+        tokens = dict(token_totals)
+    return {
+        "coalescing": question_flight.stats(),
+        "admission": admission.stats(),
+        "tenants": tenants.stats(),
+        "caches": {
+            "query_embeddings": get_query_embedding_cache().stats(),
+            "retrieval": retrieval_cache.stats()
+        },
+        "tokens": {
+            **tokens,
+            "cached_ratio": round(tokens["cached_prompt_tokens"] / tokens["prompt_tokens"], 4)
+            if tokens["prompt_tokens"] else 0.0
+        }
+    }
+
+def resolve_tenant(tenant: Optional[str]) -> str:
+    """테넌트를 확인합니다 (잘못된 ID는 400, 인덱스가 없으면 404)."""
+    try:
+        return tenants.resolve(tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TenantNotFound as e:
+        raise HTTPException(status_code=404, detail=f"테넌트 '{e}'의 인덱스가 없습니다.")
+
+def retrieval_k(request) -> int:
+    """검색할 청크 수 (재정렬 시 후보를 넉넉히 가져옴)"""
+    if request.rerank:
+        return settings.rerank_candidates if request.rerank_candidates is None else request.rerank_candidates
+    return request.context_count
+
+def retrieval_key(request, search_k: int) -> tuple:
+    return (request.tenant, normalize_question(request.question), request.multi_query, search_k)
+
+def retrieve(request, search_k: int, timings: Optional[Dict[str, int]] = None) -> tuple:
+    """유사한 컨텍스트를 검색합니다. 프리페치로 캐시된 결과가 있으면 재사용합니다.
+    (문서 목록, 캐시 사용 여부)를 반환합니다."""
+    def load():
+        with tenants.acquire(request.tenant) as vector_store:
+            if request.multi_query:
+                # 질의 변형을 함께 검색하여 표현 차이로 놓치는 청크를 보완
+                queries = query_expander.expand(request.question, settings.multi_query_variants)
+                if timings is not None:
+                    timings["queries"] = len(queries)
+                return vector_store.multi_query_search(queries, k=search_k)
+            return vector_store.similarity_search(
+                query=request.question,
+                k=search_k
+            )
+    
+    return retrieval_cache.get_or_load(retrieval_key(request, search_k), load)
+
+def answer_question(request: QuestionRequest, top_n: int) -> Dict[str, Any]:
+    """검색, 재정렬, GPT 응답 생성을 수행합니다 (스레드풀에서 실행)."""
+    timings = {}
+    
+    # 유사한 컨텍스트 검색
+    stage_start = time.time()
+    context_docs, cached = retrieve(request, retrieval_k(request), timings)
+    timings["retrieval_ms"] = int((time.time() - stage_start) * 1000)
+    if cached:
+        timings["retrieval_cached"] = 1
+    
+    # 후보 재정렬 후 상위 청크만 GPT에 전달
+    if request.rerank:
+        stage_start = time.time()
+        timings["candidates"] = len(context_docs)
+        context_docs = rerank(request.question, context_docs, top_n=top_n, reranker=reranker)
+        timings["rerank_ms"] = int((time.time() - stage_start) * 1000)
+    
+    # GPT 응답 생성
+    stage_start = time.time()
+    response = chat_engine.generate_answer(
+        question=request.question,
+        context_docs=context_docs
+    )
+    timings["generation_ms"] = int((time.time() - stage_start) * 1000)
+    
+    with token_totals_lock:
+        for key in token_totals:
+            token_totals[key] += response["usage"].get(key, 0)
+    
+    return {
+        "answer": response["answer"],
+        "contexts": response["contexts"],
+        # 신뢰도 계산 개선 (컨텍스트 유사도 기반)
+        "confidence": calculate_confidence(context_docs, request.question),
+        "timings": timings,
+        "usage": response["usage"],
+        "context_refs": [build_context_ref(doc) for doc in context_docs]
+    }
+
+def build_context_ref(doc) -> Dict[str, Any]:
+    """청크의 출처/페이지/조문 정보와 짧은 요약을 만듭니다."""
+    metadata = doc.metadata or {}
+    article = None
+    if metadata.get("article_no"):
+        article = f"제{metadata['article_no']}조"
+        if metadata.get("article_title"):
+            article += f"({metadata['article_title']})"
+    
+    snippet = " ".join(doc.page_content.split())
+    if len(snippet) > settings.snippet_length:
+        snippet = snippet[:settings.snippet_length].rstrip() + "…"
+    
+    return {
+        "chunk_id": metadata.get("chunk_id", ""),
+        "source": metadata.get("source"),
+        "page": metadata.get("page"),
+        "article": article,
+        "snippet": snippet
+    }
+
 def calculate_confidence(context_docs: List, question: str) -> float:
     """컨텍스트 유사도 기반 신뢰도 계산"""
     if not context_docs:
@@ -0,0 +1,221 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """과부하로 요청을 받을 수 없을 때 발생합니다."""
+
+    def __init__(self, reason: str, status_code: int, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # 초당 충전 토큰 수
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> Tuple[bool, float]:
+        """토큰을 하나 사용합니다. (성공 여부, 다음 토큰까지 대기 초)를 반환합니다."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate if self.rate > 0 else 60.0
+
+class RateLimiter:
+    """클라이언트(API 키)별 토큰 버킷 레이트 리미터"""
+
+    def __init__(self, per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, client_id: str) -> Tuple[bool, float]:
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[client_id] = bucket
+            # 오래 사용되지 않은 클라이언트 버킷 제거
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+        return bucket.try_acquire()
+
+class ConcurrencyLimiter:
+    """동시 LLM 호출 수 제한과 대기 시간 제한이 있는 유한 대기열"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.max_waiting = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise AdmissionRejected("queue_full", 503, self.queue_timeout)
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise AdmissionRejected("queue_timeout", 503, self.queue_timeout)
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+class AdmissionController:
+    def __init__(self, settings):
+        # 엔드포인트별로 클라이언트 버킷을 따로 둠 (프리페치가 질문 한도를 소모하지 않도록)
+        self.rate_limiters = {
+            "question": RateLimiter(settings.rate_limit_per_minute, settings.rate_limit_burst),
+            "prefetch": RateLimiter(settings.prefetch_rate_limit_per_minute, settings.prefetch_rate_limit_burst),
+        }
+        self.llm_limiter = ConcurrencyLimiter(
+            max_concurrent=settings.max_concurrent_llm_calls,
+            max_queue=settings.llm_queue_size,
+            queue_timeout=settings.llm_queue_timeout
+        )
+        self.max_prefetch = settings.prefetch_max_concurrent
+        self.prefetch_active = 0
+        self.counters = {
+            "admitted": 0,
+            "rate_limited": 0,
+            "prefetch_rate_limited": 0,
+            "queue_full": 0,
+            "queue_timeout": 0,
+            "prefetch_admitted": 0,
+            "prefetch_dropped": 0,
+        }
+
+    def check_rate(self, client_id: str, limit: str = "question") -> Tuple[bool, float]:
+        allowed, retry_after = self.rate_limiters[limit].check(client_id)
+        if not allowed:
+            self.counters["rate_limited" if limit == "question" else f"{limit}_rate_limited"] += 1
+        return allowed, retry_after
+
+    @asynccontextmanager
+    async def llm_slot(self):
+        """LLM 호출 슬롯을 확보합니다. 대기열이 가득 차거나 시간이 초과되면 AdmissionRejected 발생"""
+        try:
+            async with self.llm_limiter.slot():
+                self.counters["admitted"] += 1
+                yield
+        except AdmissionRejected as e:
+            self.counters[e.reason] += 1
+            logger.warning(f"⚠️ LLM call rejected: {e.reason}")
+            raise
+
+    @asynccontextmanager
+    async def prefetch_slot(self):
+        """프리페치 슬롯을 대기 없이 확보합니다.
+        한도에 도달했거나 LLM 호출 대기열에 질문 요청이 있으면 AdmissionRejected 발생"""
+        if self.prefetch_active >= self.max_prefetch or self.llm_limiter.waiting > 0:
+            self.counters["prefetch_dropped"] += 1
+            raise AdmissionRejected("prefetch_busy", 503, 1.0)
+        self.prefetch_active += 1
+        self.counters["prefetch_admitted"] += 1
+        try:
+            yield
+        finally:
+            self.prefetch_active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active_llm_calls": self.llm_limiter.active,
+            "active_prefetches": self.prefetch_active,
+            "queue_depth": self.llm_limiter.waiting,
+            "max_queue_depth": self.llm_limiter.max_waiting,
+            "max_concurrent_llm_calls": self.llm_limiter.max_concurrent,
+            "queue_size": self.llm_limiter.max_queue,
+            **self.counters,
+        }
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController(get_settings())
+
+def client_ip(request: Request, trusted_proxies: Tuple[str, ...] = ()) -> str:
+    """클라이언트 IP. 신뢰하는 프록시에서 온 요청은 X-Forwarded-For에서 프록시가 아닌 마지막 주소를 사용합니다."""
+    host = request.client.host if request.client else "unknown"
+    if host not in trusted_proxies:
+        return host
+    forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+    for ip in reversed(forwarded):
+        if ip not in trusted_proxies:
+            return ip
+    return forwarded[0] if forwarded else host
+
+def client_id_from_request(
+    request: Request,
+    api_keys: FrozenSet[str] = frozenset(),
+    by_ip: bool = False,
+    trusted_proxies: Tuple[str, ...] = ()
+) -> Optional[str]:
+    """등록된 API 키가 있으면 키로, 키가 없으면 IP(by_ip) 또는 공용 버킷으로 식별합니다.
+    등록되지 않은 키면 None을 반환합니다."""
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return f"key:{api_key}" if api_key in api_keys else None
+    if by_ip:
+        return f"ip:{client_ip(request, trusted_proxies)}"
+    return "anonymous"
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """지정된 경로에 클라이언트별 레이트 리밋을 적용합니다. paths는 {경로: 한도 이름} 매핑입니다."""
+
+    def __init__(self, app, paths: Dict[str, str]):
+        super().__init__(app)
+        self.paths = paths
+        settings = get_settings()
+        self.api_keys = frozenset(key.strip() for key in settings.api_keys.split(",") if key.strip())
+        self.by_ip = settings.rate_limit_by_ip
+        self.trusted_proxies = tuple(ip.strip() for ip in settings.trusted_proxies.split(",") if ip.strip())
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "POST" and request.url.path in self.paths:
+            client_id = client_id_from_request(request, self.api_keys, self.by_ip, self.trusted_proxies)
+            if client_id is None:
+                # 키를 바꿔 가며 새 버킷을 받는 것을 막기 위해 등록되지 않은 키는 거부
+                return JSONResponse(
+                    status_code=401,
+                    content={"detail": "유효하지 않은 API 키입니다."}
+                )
+            allowed, retry_after = get_admission_controller().check_rate(client_id, self.paths[request.url.path])
+            if not allowed:
+                return JSONResponse(
+                    status_code=429,
+                    content={"detail": "요청 한도를 초과했습니다. 잠시 후 다시 시도해주세요."},
+                    headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+                )
+        return await call_next(request)
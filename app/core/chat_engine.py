@@ -1,25 +1,41 @@
 from typing import List, Dict, Any
-from langchain.chat_models import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import Document
+from langchain.schema import Document, SystemMessage, HumanMessage
 from langchain_openai import ChatOpenAI
 from ..core.config import get_settings
 
 settings = get_settings()
 
-SYSTEM_TEMPLATE = """당신은 동양생명 보험 상담 전문가입니다.
+# 고정 지침은 모든 요청에서 동일한 system 메시지(프롬프트 앞부분)로 두어
+# OpenAI 프롬프트 캐싱이 적용되도록 하고, 요청마다 바뀌는 내용은 뒤에 배치
+SYSTEM_PROMPT = """당신은 동양생명 보험 상담 전문가입니다.
 주어진 보험 약관 내용을 바탕으로 사용자의 질문에 정확하고 친절하게 답변해주세요.
 
 답변 시 다음 가이드라인을 따라주세요:
 1. 약관에 명시된 내용만을 기반으로 답변하세요.
 2. 확실하지 않은 내용은 "약관에서 해당 내용을 찾을 수 없습니다"라고 답변하세요.
 3. 답변은 친절하고 이해하기 쉽게 작성하세요.
-4. 중요한 조건이나 예외사항이 있다면 반드시 언급해주세요.
+4. 중요한 조건이나 예외사항이 있다면 반드시 언급해주세요."""
 
-관련 약관 내용:
-{context}
+CONTEXT_HEADER = "관련 약관 내용:\n"
+QUESTION_HEADER = "\n\n사용자 질문: "
 
-사용자 질문: {question}"""
+# 고정 system 메시지는 한 번만 생성하여 재사용
+SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+
+def format_user_message(question: str, context: str) -> str:
+    """요청별 user 메시지를 만듭니다 (템플릿 파싱 없이 문자열 결합)."""
+    return CONTEXT_HEADER + context + QUESTION_HEADER + question
+
+def extract_token_usage(llm_output: Dict[str, Any]) -> Dict[str, int]:
+    """OpenAI 응답의 토큰 사용량과 캐시된 프롬프트 토큰 수를 정리합니다."""
+    usage = (llm_output or {}).get("token_usage") or {}
+    details = usage.get("prompt_tokens_details") or {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "cached_prompt_tokens": details.get("cached_tokens", 0) or 0,
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "total_tokens": usage.get("total_tokens", 0),
+    }
 
 class ChatEngine:
     def __init__(self):
@@ -28,22 +44,20 @@ class ChatEngine:
             temperature=0,
             api_key=settings.openai_api_key
         )
-        
-        self.prompt = ChatPromptTemplate.from_template(SYSTEM_TEMPLATE)
-    
+
+    def build_messages(self, question: str, context_docs: List[Document]) -> list:
+        context = "\n\n".join([doc.page_content for doc in context_docs])
+        return [SYSTEM_MESSAGE, HumanMessage(content=format_user_message(question, context))]
+
     def generate_answer(self, question: str, context_docs: List[Document]) -> Dict[str, Any]:
         """컨텍스트를 기반으로 질문에 대한 답변을 생성합니다."""
-        context = "\n\n".join([doc.page_content for doc in context_docs])
-        
-        messages = self.prompt.format_messages(
-            context=context,
-            question=question
-        )
-        
-        response = self.llm.invoke(messages)
-        
+        messages = self.build_messages(question, context_docs)
+
+        result = self.llm.generate([messages])
+
         return {
-            "answer": response.content,
+            "answer": result.generations[0][0].message.content,
             "contexts": [doc.page_content for doc in context_docs],
+            "usage": extract_token_usage(result.llm_output),
             "confidence": 0.8  # TODO: 실제 신뢰도 계산 구현
-        } 
\ No newline at end of file
+        }
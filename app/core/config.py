@@ -11,13 +11,64 @@ class Settings(BaseSettings):
     # 벡터 DB 설정
     vector_store_path: str = "vector_store"
     documents_path: str = "documents"
+    embedding_dimensions: int = 1536  # text-embedding-ada-002
+    
+    # 멀티 테넌트 설정 (기본 테넌트는 vector_store_path를 그대로 사용)
+    default_tenant: str = "default"
+    tenant_memory_budget_mb: int = 1024
+    
+    # PDF 텍스트 추출 설정
+    pdf_backend: str = "pypdf2"  # "pypdf2" 또는 "pymupdf"
+    extraction_cache_path: Optional[str] = ".cache/pdf_text"  # None이면 캐시 사용 안 함
+    embedding_cache_path: str = ".cache/embeddings.sqlite"
     
     # 문서 처리 설정
     chunk_size: int = 500
     chunk_overlap: int = 50
+    chunk_strategy: str = "structure"  # "structure" (조/항/호 기반) 또는 "recursive"
+    chunk_tokens: int = 700  # 기존 recursive(500자) 분할보다 청크 수가 적은 크기
+    chunk_overlap_tokens: int = 40
+    
+    # 중복 제거 설정
+    dedup_enabled: bool = True
+    dedup_near_threshold: int = 3  # SimHash 해밍 거리 (0이면 완전 중복만 제거)
+    
+    # 재정렬(rerank) 설정
+    rerank_candidates: int = 30
+    rerank_top_n: int = 3
+    reranker_model: Optional[str] = None  # 예: "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    
+    # 다중 질의(multi-query) 검색 설정
+    multi_query_variants: int = 3
+    query_expansion_model: Optional[str] = None  # 지정 시 LLM으로 질의 변형 생성 (예: "gpt-3.5-turbo")
+    
+    # 부하 제어 설정
+    # 레이트 리밋은 api_keys에 등록된 X-API-Key별로 적용되며, 등록되지 않은 키는 401로 거부
+    # 키 없는 요청은 하나의 공용 버킷을 함께 쓰고, rate_limit_by_ip를 켜면 IP별 버킷을 사용
+    # (프록시나 다른 서비스를 거쳐 들어오면 모든 사용자가 같은 IP로 보이므로 IP별 제한은 기본값으로 꺼 둠)
+    rate_limit_enabled: bool = True
+    rate_limit_per_minute: float = 60
+    rate_limit_burst: int = 10
+    api_keys: str = ""  # 발급된 API 키 (쉼표 구분)
+    rate_limit_by_ip: bool = False
+    trusted_proxies: str = ""  # X-Forwarded-For를 신뢰할 프록시 IP (쉼표 구분)
+    max_concurrent_llm_calls: int = 8
+    llm_queue_size: int = 32
+    llm_queue_timeout: float = 10.0  # 초
+    
+    # 검색 캐시 / 프리페치 설정
+    query_embedding_cache_size: int = 1024
+    retrieval_cache_size: int = 512
+    retrieval_cache_ttl: float = 300.0  # 초
+    prefetch_max_concurrent: int = 2  # 초과하거나 질문 요청이 대기 중이면 프리페치를 건너뜀
+    prefetch_min_chars: int = 4
+    prefetch_rate_limit_per_minute: float = 120  # 질문 요청과 별도의 클라이언트별 버킷
+    prefetch_rate_limit_burst: int = 10
     
     # API 설정
     api_prefix: str = "/api"
+    snippet_length: int = 120  # compact 응답의 청크 요약 길이 (글자)
+    gzip_minimum_size: int = 1000  # 이 크기(바이트) 이상의 응답만 gzip 압축
     debug: bool = False
     
     class Config:
@@ -0,0 +1,78 @@
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """텍스트 임베딩 디스크 캐시 (SQLite, 모델명 + 텍스트 해시를 키로 사용)"""
+
+    def __init__(self, path: str, model: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.model = model
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model}\n{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [self._key(text) for text in texts]
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하기 위해 나눠서 조회
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return [found.get(key) for key in keys]
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        rows = [(self._key(text), array("f", vector).tobytes()) for text, vector in zip(texts, vectors)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+class CachedEmbeddings:
+    """캐시에 없는 텍스트만 실제 임베딩 모델로 계산하는 래퍼"""
+
+    def __init__(self, embeddings, cache: EmbeddingCache, batch_size: int = 100):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        # 같은 텍스트가 여러 번 나와도 한 번만 요청
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        computed = {}
+        for start in range(0, len(unique_texts), self.batch_size):
+            batch = unique_texts[start:start + self.batch_size]
+            batch_vectors = self.embeddings.embed_documents(batch)
+            self.cache.put_many(batch, batch_vectors)
+            computed.update(zip(batch, batch_vectors))
+
+        for i in missing:
+            vectors[i] = computed[texts[i]]
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
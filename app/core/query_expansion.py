@@ -0,0 +1,89 @@
+import re
+import logging
+from typing import Dict, List, Optional
+from .reranker import tokenize
+
+logger = logging.getLogger(__name__)
+
+# 보험 용어 동의어 사전 (질문 표현 -> 약관/안내장 표현)
+INSURANCE_SYNONYMS: Dict[str, List[str]] = {
+    "입원비": ["입원급여금", "입원일당", "입원보험금"],
+    "수술비": ["수술급여금", "수술보험금"],
+    "진단비": ["진단급여금", "진단보험금"],
+    "재해": ["상해", "사고"],
+    "한도": ["지급한도", "보장한도", "최고 지급금액"],
+    "보험료": ["납입보험료", "월 보험료"],
+    "해지환급금": ["해약환급금", "환급금"],
+    "해지": ["해약", "계약 해지"],
+    "갑상선암": ["유사암", "소액암"],
+    "일반암": ["암", "일반 암"],
+    "보장": ["보상", "지급사유"],
+    "치아치료": ["치과치료", "보철치료"],
+    "간병": ["장기요양", "간병인"],
+    "종신보험": ["사망보장 보험", "종신"],
+    "가입": ["청약", "가입 조건"],
+    "면책": ["보상하지 않는 손해", "보험금을 지급하지 않는 사유"],
+    "보험금": ["급여금", "지급금액"],
+    "대기기간": ["면책기간", "보장개시일"],
+}
+
+PARAPHRASE_PROMPT = """다음 보험 질문을 보험 약관에서 쓰는 표현으로 바꾼 검색용 질의를 {n}개 작성하세요.
+한 줄에 하나씩, 번호나 설명 없이 질의만 출력하세요.
+
+질문: {question}"""
+
+def synonym_variants(query: str, max_variants: int) -> List[str]:
+    """동의어 치환과 핵심어 추출로 질의 변형을 생성합니다."""
+    matched = [term for term in sorted(INSURANCE_SYNONYMS, key=len, reverse=True) if term in query]
+
+    variants = []
+    if matched:
+        depth = max(len(INSURANCE_SYNONYMS[term]) for term in matched)
+        for i in range(depth):
+            variant = query
+            for term in matched:
+                # 긴 용어가 먼저 치환된 경우(예: 해지환급금 -> 해지) 중복 치환 방지
+                if term not in variant:
+                    continue
+                synonyms = INSURANCE_SYNONYMS[term]
+                variant = variant.replace(term, synonyms[min(i, len(synonyms) - 1)])
+            variants.append(variant)
+
+    # 조사/어미를 뺀 핵심어 질의
+    keywords = " ".join(tokenize(query))
+    if keywords and keywords != re.sub(r"[^\w\s]", "", query).strip().lower():
+        variants.append(keywords)
+
+    unique = []
+    for variant in variants:
+        if variant != query and variant not in unique:
+            unique.append(variant)
+    return unique[:max_variants]
+
+class QueryExpander:
+    """질의 확장기 (기본: 동의어 사전, model_name 지정 시 저비용 LLM 사용)"""
+
+    def __init__(self, openai_api_key: Optional[str] = None, model_name: Optional[str] = None):
+        self.llm = None
+        if model_name:
+            from langchain_openai import ChatOpenAI
+
+            self.llm = ChatOpenAI(model_name=model_name, temperature=0, api_key=openai_api_key)
+
+    def expand(self, query: str, max_variants: int = 3) -> List[str]:
+        """원 질의를 포함한 질의 목록을 반환합니다."""
+        variants: List[str] = []
+        if self.llm is not None:
+            try:
+                response = self.llm.invoke(PARAPHRASE_PROMPT.format(n=max_variants, question=query))
+                lines = [re.sub(r"^\s*(\d+[.)]|-)\s*", "", line).strip() for line in response.content.splitlines()]
+                variants = [line for line in lines if line and line != query]
+            except Exception as e:
+                logger.warning(f"⚠️ LLM query expansion failed, using synonym dictionary: {e}")
+
+        if len(variants) < max_variants:
+            for variant in synonym_variants(query, max_variants):
+                if variant not in variants:
+                    variants.append(variant)
+
+        return [query] + variants[:max_variants]
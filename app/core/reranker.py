@@ -0,0 +1,112 @@
+import re
+import logging
+from typing import List, Optional, Set
+from langchain.schema import Document
+
+logger = logging.getLogger(__name__)
+
+# 조문 제목 패턴 (예: "제3조(보험금의 지급사유)", "제3조 【보험금의 지급사유】", "제3조 보험금의 지급사유")
+ARTICLE_TITLE_PATTERN = re.compile(r"제\s*\d+\s*조(?:의\s*\d+)?\s*[(（\[【]?\s*([^)）\]】.\n]{1,40})")
+TOKEN_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+# 질문에 흔히 붙는 의미 없는 어미/조사
+STOPWORDS = {
+    "은", "는", "이", "가", "을", "를", "의", "에", "도", "인가요", "무엇인가요",
+    "얼마인가요", "어떤", "있나요", "되나요", "어떻게", "알려주세요", "하나요",
+}
+
+def tokenize(text: str) -> List[str]:
+    """텍스트를 단어 토큰으로 분리합니다."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+def char_bigrams(text: str) -> Set[str]:
+    """형태소 분석기 없이 한국어를 비교하기 위한 음절 바이그램 집합"""
+    bigrams = set()
+    for token in tokenize(text):
+        if len(token) == 1:
+            bigrams.add(token)
+            continue
+        for i in range(len(token) - 1):
+            bigrams.add(token[i:i + 2])
+    return bigrams
+
+def section_title(doc: Document) -> str:
+    """청크의 조문 제목을 반환합니다 (메타데이터 우선, 없으면 본문에서 추출)"""
+    title = doc.metadata.get("article_title") if doc.metadata else None
+    if title:
+        return str(title)
+    match = ARTICLE_TITLE_PATTERN.search(doc.page_content[:200])
+    return match.group(1).strip() if match else ""
+
+class LexicalReranker:
+    """용어 중복도와 조문 제목 일치도 기반의 경량 재정렬기"""
+
+    def __init__(self, title_weight: float = 0.5, rank_weight: float = 0.1):
+        self.title_weight = title_weight
+        self.rank_weight = rank_weight
+
+    def score(self, query: str, docs: List[Document]) -> List[float]:
+        query_bigrams = char_bigrams(query)
+        query_tokens = set(tokenize(query))
+        if not query_bigrams:
+            return [0.0] * len(docs)
+
+        scores = []
+        for rank, doc in enumerate(docs):
+            doc_bigrams = char_bigrams(doc.page_content)
+            overlap = len(query_bigrams & doc_bigrams) / len(query_bigrams)
+
+            # 완전히 일치하는 단어에 가산점
+            exact = sum(1 for t in query_tokens if t in doc.page_content) / max(len(query_tokens), 1)
+
+            title_bigrams = char_bigrams(section_title(doc))
+            title_match = len(query_bigrams & title_bigrams) / len(query_bigrams) if title_bigrams else 0.0
+
+            # 벡터 검색 순위를 약한 사전 정보로 사용
+            rank_prior = 1.0 / (rank + 1)
+
+            scores.append(
+                overlap + 0.5 * exact + self.title_weight * title_match + self.rank_weight * rank_prior
+            )
+        return scores
+
+class CrossEncoderReranker:
+    """CPU에서 동작하는 cross-encoder 재정렬기 (sentence-transformers 필요)"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def score(self, query: str, docs: List[Document]) -> List[float]:
+        if not docs:
+            return []
+        pairs = [(query, doc.page_content) for doc in docs]
+        return [float(s) for s in self.model.predict(pairs)]
+
+def rerank(query: str, docs: List[Document], top_n: int, reranker=None) -> List[Document]:
+    """후보 문서를 재정렬하여 상위 top_n개를 반환합니다."""
+    if not docs:
+        return []
+    reranker = reranker or LexicalReranker()
+    scores = reranker.score(query, docs)
+
+    ranked = sorted(zip(scores, range(len(docs)), docs), key=lambda x: (-x[0], x[1]))
+    results = []
+    for score, _, doc in ranked[:top_n]:
+        doc.metadata = dict(doc.metadata or {})
+        doc.metadata["rerank_score"] = round(score, 4)
+        results.append(doc)
+    return results
+
+def load_reranker(model_name: Optional[str] = None):
+    """설정에 따라 재정렬기를 생성합니다 (cross-encoder 로드 실패 시 lexical로 대체)"""
+    if model_name:
+        try:
+            reranker = CrossEncoderReranker(model_name)
+            logger.info(f"✅ Cross-encoder reranker '{model_name}' loaded")
+            return reranker
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load cross-encoder '{model_name}', using lexical reranker: {e}")
+    return LexicalReranker()
@@ -0,0 +1,117 @@
+import time
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from langchain.schema import Document
+from .config import get_settings
+
+def copy_documents(documents: List[Document]) -> List[Document]:
+    """캐시된 문서를 복사합니다 (재정렬 점수 등 metadata 변경이 캐시에 남지 않도록)."""
+    return [Document(page_content=doc.page_content, metadata=dict(doc.metadata)) for doc in documents]
+
+class QueryEmbeddingCache:
+    """질의 임베딩 LRU 캐시 (프리페치한 질의는 질문 요청에서 다시 임베딩하지 않음)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, texts: List[str], embed: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        with self._lock:
+            vectors: List[Optional[List[float]]] = []
+            for text in texts:
+                vector = self._vectors.get(text)
+                if vector is not None:
+                    self._vectors.move_to_end(text)
+                vectors.append(vector)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+
+        computed = dict(zip(missing, embed(missing))) if missing else {}
+        with self._lock:
+            self.hits += len(texts) - sum(1 for vector in vectors if vector is None)
+            self.misses += len(missing)
+            for text, vector in computed.items():
+                self._vectors[text] = vector
+                self._vectors.move_to_end(text)
+            while len(self._vectors) > self.max_size:
+                self._vectors.popitem(last=False)
+
+        return [vector if vector is not None else computed[text] for text, vector in zip(texts, vectors)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._vectors), "hits": self.hits, "misses": self.misses}
+
+class RetrievalCache:
+    """검색 결과 TTL 캐시. 같은 키를 동시에 조회하면 먼저 시작한 검색 결과를 기다려 공유합니다."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[Document]]]" = OrderedDict()
+        self._loading: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_fresh(self, key: Hashable) -> Optional[List[Document]]:
+        """만료되지 않은 항목을 반환합니다 (lock 보유 상태에서 호출)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, documents = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return documents
+
+    def get(self, key: Hashable) -> Optional[List[Document]]:
+        with self._lock:
+            documents = self._get_fresh(key)
+        return copy_documents(documents) if documents is not None else None
+
+    def get_or_load(self, key: Hashable, load: Callable[[], List[Document]]) -> Tuple[List[Document], bool]:
+        """캐시된 검색 결과를 반환하거나 load()로 검색합니다. (문서 목록, 캐시 사용 여부)를 반환합니다."""
+        while True:
+            with self._lock:
+                documents = self._get_fresh(key)
+                if documents is not None:
+                    self.hits += 1
+                    return copy_documents(documents), True
+                event = self._loading.get(key)
+                if event is None:
+                    self._loading[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # 프리페치 등 진행 중인 동일 검색이 끝나면 캐시를 다시 확인
+            event.wait()
+
+        try:
+            documents = load()
+            # 검색 실패 시 빈 결과가 반환되므로 결과가 있을 때만 저장
+            if documents:
+                with self._lock:
+                    self._entries[key] = (time.monotonic(), copy_documents(documents))
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+        return documents, False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+@lru_cache()
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    return QueryEmbeddingCache(get_settings().query_embedding_cache_size)
+
+@lru_cache()
+def get_retrieval_cache() -> RetrievalCache:
+    settings = get_settings()
+    return RetrievalCache(settings.retrieval_cache_size, settings.retrieval_cache_ttl)
@@ -0,0 +1,53 @@
+import re
+import asyncio
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+TRAILING_PUNCT_PATTERN = re.compile(r"[\s?？!.。~]+$")
+
+def normalize_question(question: str) -> str:
+    """공백, 전각 문자, 끝 문장부호 차이를 무시하도록 질문을 정규화합니다."""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = WHITESPACE_PATTERN.sub(" ", text).strip()
+    return TRAILING_PUNCT_PATTERN.sub("", text)
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 요청이 하나의 계산 결과를 공유하도록 합니다."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """fn을 실행하거나 진행 중인 동일 요청의 결과를 기다립니다. (결과, 공유 여부)를 반환합니다."""
+        task = self._inflight.get(key)
+        shared = task is not None
+
+        if shared:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            # 별도 태스크로 실행하여 첫 요청이 취소되어도 나머지 요청은 결과를 받음
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+
+        return await asyncio.shield(task), shared
+
+    def _on_done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 호출자가 취소된 경우에도 예외 미확인 경고가 남지 않도록 함
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesce_ratio": round(self.coalesced / total, 4) if total else 0.0,
+        }
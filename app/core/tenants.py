@@ -0,0 +1,128 @@
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from .config import get_settings
+from .vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+TENANT_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+class TenantNotFound(Exception):
+    """벡터 인덱스가 없는 테넌트를 요청했을 때 발생합니다."""
+
+def tenant_path(tenant: str, settings=None) -> str:
+    """테넌트별 인덱스 경로 (기본 테넌트는 기존 vector_store_path를 그대로 사용)"""
+    settings = settings or get_settings()
+    if tenant == settings.default_tenant:
+        return settings.vector_store_path
+    return os.path.join(settings.vector_store_path, "tenants", tenant)
+
+def validate_tenant(tenant: str) -> str:
+    if not TENANT_ID_PATTERN.match(tenant):
+        raise ValueError("tenant는 영문 소문자, 숫자, '-', '_'로 된 63자 이하의 값이어야 합니다.")
+    return tenant
+
+class TenantRegistry:
+    """테넌트별 VectorStore를 필요할 때 로드하고, 메모리 예산을 넘으면 오래 쓰지 않은 인덱스를 내립니다."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.memory_budget = settings.tenant_memory_budget_mb * 1024 * 1024
+        self._stores: "OrderedDict[str, VectorStore]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._in_use: Dict[str, int] = {}
+        self._loading: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def resolve(self, tenant: Optional[str]) -> str:
+        """테넌트 ID를 검증하고 인덱스가 있는지 확인합니다."""
+        tenant = validate_tenant(tenant or self.settings.default_tenant)
+        if tenant != self.settings.default_tenant and not os.path.isdir(tenant_path(tenant, self.settings)):
+            raise TenantNotFound(tenant)
+        return tenant
+
+    @contextmanager
+    def acquire(self, tenant: Optional[str] = None):
+        """테넌트의 VectorStore를 빌려 씁니다. 사용 중인 인덱스는 내려가지 않습니다."""
+        tenant = self.resolve(tenant)
+        store = self._checkout(tenant)
+
+        try:
+            yield store
+        finally:
+            with self._lock:
+                self._in_use[tenant] -= 1
+                self._evict()
+
+    def _checkout(self, tenant: str) -> VectorStore:
+        """로드된 VectorStore를 사용 중으로 표시해 반환합니다.
+        인덱스 로드는 lock 밖에서 하고, 같은 테넌트를 동시에 요청하면 먼저 시작한 로드를 기다립니다."""
+        while True:
+            with self._lock:
+                store = self._stores.get(tenant)
+                if store is not None:
+                    self._stores.move_to_end(tenant)
+                    self._in_use[tenant] = self._in_use.get(tenant, 0) + 1
+                    return store
+                event = self._loading.get(tenant)
+                if event is None:
+                    self._loading[tenant] = threading.Event()
+                    break
+            event.wait()
+
+        try:
+            store = VectorStore(
+                openai_api_key=self.settings.openai_api_key,
+                collection_name="insurance_docs",
+                persist_path=tenant_path(tenant, self.settings)
+            )
+            size = store.estimated_memory_bytes(self.settings.embedding_dimensions)
+            with self._lock:
+                self._stores[tenant] = store
+                self._sizes[tenant] = size
+                self._in_use[tenant] = self._in_use.get(tenant, 0) + 1
+                self.loads += 1
+        finally:
+            # 로드에 실패하면 기다리던 요청이 다시 로드를 시도함
+            with self._lock:
+                self._loading.pop(tenant).set()
+
+        logger.info(f"📂 Tenant '{tenant}' loaded (~{size // (1024 * 1024)}MB)")
+        return store
+
+    def _evict(self):
+        """메모리 예산을 넘는 동안 가장 오래 사용하지 않은 유휴 테넌트부터 내립니다 (lock 보유 상태에서 호출)."""
+        total = sum(self._sizes.values())
+        for tenant in list(self._stores):
+            if total <= self.memory_budget:
+                break
+            if self._in_use.get(tenant):
+                continue
+            store = self._stores.pop(tenant)
+            total -= self._sizes.pop(tenant)
+            self._in_use.pop(tenant, None)
+            store.close()
+            self.evictions += 1
+            logger.info(f"📤 Tenant '{tenant}' unloaded (memory budget {self.settings.tenant_memory_budget_mb}MB)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": list(self._stores),
+                "estimated_memory_mb": round(sum(self._sizes.values()) / (1024 * 1024), 1),
+                "memory_budget_mb": self.settings.tenant_memory_budget_mb,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+@lru_cache()
+def get_tenant_registry() -> TenantRegistry:
+    return TenantRegistry(get_settings())
@@ -5,7 +5,10 @@ from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document
 import chromadb
 from chromadb.config import Settings
+from chromadb.api.client import SharedSystemClient
 import time
+from .config import get_settings
+from .retrieval_cache import get_query_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +23,14 @@ class OpenAIEmbeddingFunction:
         return self.embeddings.embed_documents(input)
 
 class VectorStore:
-    def __init__(self, openai_api_key: str, collection_name: str = "insurance_docs"):
+    def __init__(self, openai_api_key: str, collection_name: str = "insurance_docs", persist_path: Optional[str] = None):
         self.openai_api_key = openai_api_key
         self.collection_name = collection_name
+        self.persist_path = persist_path or get_settings().vector_store_path
         
         # ChromaDB 클라이언트 초기화
         self.client = chromadb.PersistentClient(
-            path="./vector_store",
+            path=self.persist_path,
             settings=Settings(anonymized_telemetry=False)
         )
         
@@ -64,7 +68,8 @@ class VectorStore:
                 try:
                     texts = [doc.page_content for doc in batch]
                     metadatas = [doc.metadata for doc in batch]
-                    ids = [f"doc_{i + j}" for j in range(len(batch))]
+                    # 중복 제거된 청크는 content hash 기반 chunk_id를 그대로 사용
+                    ids = [doc.metadata.get("chunk_id") or f"doc_{i + j}" for j, doc in enumerate(batch)]
                     
                     self.collection.add(
                         documents=texts,
@@ -94,11 +99,15 @@ class VectorStore:
         """기존 방식 (호환성 유지)"""
         self.add_documents_batch(documents)
     
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """질의 임베딩 (프로세스 공용 LRU 캐시에 없는 질의만 한 번에 요청)"""
+        return get_query_embedding_cache().get_or_compute(queries, self.embedding_function)
+    
     def similarity_search(self, query: str, k: int = 5) -> List[Document]:
         """유사도 검색"""
         try:
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=self.embed_queries([query]),
                 n_results=k
             )
             
@@ -106,6 +115,7 @@ class VectorStore:
             if results['documents'] and results['documents'][0]:
                 for i, doc in enumerate(results['documents'][0]):
                     metadata = results['metadatas'][0][i] if results['metadatas'] and results['metadatas'][0] else {}
+                    metadata = {**(metadata or {}), "chunk_id": results['ids'][0][i]}
                     documents.append(Document(page_content=doc, metadata=metadata))
             
             return documents
@@ -114,6 +124,78 @@ class VectorStore:
             logger.error(f"❌ Similarity search failed: {e}")
             return []
     
+    def multi_query_search(self, queries: List[str], k: int = 5, rrf_k: int = 60) -> List[Document]:
+        """여러 질의를 한 번에 임베딩/검색하고 RRF(Reciprocal Rank Fusion)로 결과를 합칩니다."""
+        try:
+            # 모든 질의를 단일 임베딩 요청과 단일 collection.query로 처리
+            query_embeddings = self.embed_queries(queries)
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=k
+            )
+            
+            fused_scores = {}
+            fused_docs = {}
+            for q in range(len(queries)):
+                if not results['documents'] or not results['documents'][q]:
+                    continue
+                for rank, doc in enumerate(results['documents'][q]):
+                    doc_id = results['ids'][q][rank]
+                    fused_scores[doc_id] = fused_scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+                    if doc_id not in fused_docs:
+                        metadata = results['metadatas'][q][rank] if results['metadatas'] and results['metadatas'][q] else {}
+                        fused_docs[doc_id] = Document(
+                            page_content=doc,
+                            metadata={**(metadata or {}), "chunk_id": doc_id}
+                        )
+            
+            ranked_ids = sorted(fused_scores, key=lambda doc_id: fused_scores[doc_id], reverse=True)[:k]
+            documents = []
+            for doc_id in ranked_ids:
+                doc = fused_docs[doc_id]
+                doc.metadata["fusion_score"] = round(fused_scores[doc_id], 6)
+                documents.append(doc)
+            
+            return documents
+            
+        except Exception as e:
+            logger.error(f"❌ Multi-query search failed: {e}")
+            return []
+    
+    def get_chunk(self, chunk_id: str) -> Optional[Document]:
+        """ID로 청크 하나를 조회합니다."""
+        try:
+            result = self.collection.get(ids=[chunk_id])
+            if not result['ids']:
+                return None
+            metadata = result['metadatas'][0] if result['metadatas'] else {}
+            return Document(
+                page_content=result['documents'][0],
+                metadata={**(metadata or {}), "chunk_id": chunk_id}
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to get chunk '{chunk_id}': {e}")
+            return None
+    
+    def estimated_memory_bytes(self, dimensions: int) -> int:
+        """검색 시 메모리에 올라가는 인덱스 크기 추정치 (벡터 + HNSW 링크/메타데이터 여유분)"""
+        try:
+            count = self.collection.count()
+        except Exception:
+            return 0
+        return count * (dimensions * 4 + 512)
+    
+    def close(self):
+        """이 경로의 ChromaDB 시스템(HNSW 인덱스, SQLite 연결)을 내려 메모리를 반환합니다."""
+        try:
+            # chromadb 0.4.x는 경로별 시스템을 클래스 변수에 캐시하므로 직접 제거해야 해제됨
+            system = SharedSystemClient._identifer_to_system.pop(self.client._identifier, None)
+            if system is not None:
+                system.stop()
+            logger.info(f"🧹 Vector store '{self.persist_path}' unloaded")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to unload vector store '{self.persist_path}': {e}")
+    
     def get_collection_info(self) -> dict:
         """컬렉션 정보 반환"""
         try:
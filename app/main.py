@@ -1,11 +1,13 @@
 import os
 from typing import Dict, Any
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 from .api import chat
 from .core.config import get_settings
+from .core.admission import RateLimitMiddleware
 
 # 환경 변수 로드
 load_dotenv()
@@ -15,7 +17,8 @@ settings = get_settings()
 app = FastAPI(
     title="동양생명 보험 상담 AI API",
     description="보험 약관 기반 질의응답 API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS 설정
@@ -27,6 +30,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 큰 응답(청크 전문 포함 등)은 gzip 압축
+app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size)
+
+# 클라이언트별 레이트 리밋 (OpenAI를 호출하는 엔드포인트에만 적용, 프리페치는 별도 한도)
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware, paths={
+        "/api/chat/question": "question",
+        "/api/chat/prefetch": "prefetch",
+    })
+
 # 라우터 등록
 app.include_router(chat.router, prefix="/api")
 
@@ -61,6 +74,9 @@ async def startup_event():
         print("🎯 API 엔드포인트:")
         print("   GET  /health - 서버 상태 확인")
         print("   POST /api/chat/question - 질의응답")
+        print("   POST /api/chat/prefetch - 입력 중 검색 미리 수행")
+        print("   GET  /api/chat/chunks/{chunk_id} - 청크 전문 조회")
+        print("   GET  /api/chat/metrics - 요청 처리 통계")
         print("=" * 60)
         print("✅ 서버 시작 완료!")
         
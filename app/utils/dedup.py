@@ -0,0 +1,151 @@
+import re
+import hashlib
+import logging
+from typing import List, Dict, Set, Tuple
+from langchain.schema import Document
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+SIMHASH_BITS = 64
+
+def normalize_text(text: str) -> str:
+    """공백 차이를 무시하도록 텍스트를 정규화합니다."""
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+def content_hash(text: str) -> str:
+    """정규화된 텍스트의 SHA-1 해시"""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+def shingles(text: str, shingle_size: int = 3) -> List[str]:
+    """공백을 제외한 음절 n-gram 목록"""
+    text = normalize_text(text).replace(" ", "")
+    if len(text) < shingle_size:
+        return [text]
+    return [text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1)]
+
+def label_tokens(text: str) -> Tuple[str, ...]:
+    """숫자 토큰 순서 (조문 번호, 보장형 번호, 기간, 금액 등 청크를 구분하는 라벨)"""
+    return tuple(NUMBER_PATTERN.findall(text))
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """음절 n-gram 기반 64비트 SimHash를 계산합니다."""
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles(text, shingle_size):
+        h = int.from_bytes(hashlib.md5(shingle.encode("utf-8")).digest()[:8], "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        if weights[bit] > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def _bands(fingerprint: int, num_bands: int) -> List[Tuple[int, int]]:
+    """해밍 거리 num_bands - 1 이하인 지문은 최소 한 밴드가 일치합니다 (비둘기집 원리)."""
+    width = SIMHASH_BITS // num_bands
+    bands = []
+    for i in range(num_bands):
+        bits = width if i < num_bands - 1 else SIMHASH_BITS - width * i
+        bands.append((i, (fingerprint >> (i * width)) & ((1 << bits) - 1)))
+    return bands
+
+def _location(doc: Document) -> str:
+    """"출처:페이지:조문번호" 형식의 위치 (Chroma 메타데이터는 스칼라만 허용)"""
+    metadata = doc.metadata or {}
+    return f"{metadata.get('source', '')}:{metadata.get('page', '')}:{metadata.get('article_no', '')}"
+
+def _merge_sources(kept: Document, duplicate: Document):
+    sources = kept.metadata["sources"].split("|")
+    source = duplicate.metadata.get("source")
+    if source and source not in sources:
+        sources.append(source)
+        kept.metadata["sources"] = "|".join(sources)
+        kept.metadata["source_count"] = len(sources)
+
+    # 제거되는 청크의 페이지/조문 정보도 보존
+    locations = kept.metadata["locations"].split("|")
+    location = _location(duplicate)
+    if location not in locations:
+        locations.append(location)
+        kept.metadata["locations"] = "|".join(locations)
+
+def deduplicate_documents(
+    documents: List[Document],
+    near_threshold: int = 3,
+    min_similarity: float = 0.9
+) -> Tuple[List[Document], Dict[str, int]]:
+    """완전 중복(해시)과 유사 중복(SimHash) 청크를 제거합니다.
+
+    SimHash 해밍 거리가 near_threshold 이하인 후보는 음절 n-gram
+    Jaccard 유사도가 min_similarity 이상이고 숫자 토큰(조문 번호, 보장형,
+    기간 등)이 모두 같으며 서로 다른 문서에서 나온 경우에만 중복으로 처리합니다.
+    남은 청크의 metadata에는 content hash 기반 chunk_id와
+    원본 문서 목록(sources, '|' 구분), source_count, 그리고 병합된 청크들의
+    위치(locations, "출처:페이지:조문번호"의 '|' 구분 목록)가 기록됩니다.
+    near_threshold가 0 이하이면 유사 중복 검사를 생략합니다.
+    """
+    num_bands = min(near_threshold + 1, SIMHASH_BITS)
+    unique: List[Document] = []
+    by_hash: Dict[str, Document] = {}
+    band_index: Dict[Tuple[int, int], List[Tuple[int, Set[str], Tuple[str, ...], Document]]] = {}
+    stats = {"input": len(documents), "exact_duplicates": 0, "near_duplicates": 0}
+
+    for doc in documents:
+        digest = content_hash(doc.page_content)
+
+        kept = by_hash.get(digest)
+        if kept is not None:
+            _merge_sources(kept, doc)
+            stats["exact_duplicates"] += 1
+            continue
+
+        fingerprint = simhash(doc.page_content) if near_threshold > 0 else 0
+        doc_shingles: Set[str] = set()
+        doc_labels = label_tokens(doc.page_content)
+        if near_threshold > 0:
+            doc_shingles = set(shingles(doc.page_content))
+            match = None
+            for band in _bands(fingerprint, num_bands):
+                for other_fp, other_shingles, other_labels, other_doc in band_index.get(band, []):
+                    # 같은 문서 안의 유사 청크는 특약/보장형별로 다른 조항인 경우가 많아 병합하지 않음
+                    if (bin(fingerprint ^ other_fp).count("1") <= near_threshold
+                            and doc.metadata.get("source") not in other_doc.metadata["sources"].split("|")
+                            and doc_labels == other_labels
+                            and jaccard(doc_shingles, other_shingles) >= min_similarity):
+                        match = other_doc
+                        break
+                if match is not None:
+                    break
+
+            if match is not None:
+                _merge_sources(match, doc)
+                by_hash[digest] = match
+                stats["near_duplicates"] += 1
+                continue
+
+        doc.metadata = dict(doc.metadata or {})
+        doc.metadata["chunk_id"] = f"chunk_{digest[:16]}"
+        doc.metadata["sources"] = doc.metadata.get("source", "")
+        doc.metadata["source_count"] = 1
+        doc.metadata["locations"] = _location(doc)
+        by_hash[digest] = doc
+        unique.append(doc)
+
+        if near_threshold > 0:
+            for band in _bands(fingerprint, num_bands):
+                band_index.setdefault(band, []).append((fingerprint, doc_shingles, doc_labels, doc))
+
+    stats["output"] = len(unique)
+    logger.info(
+        f"🧹 Deduplicated {stats['input']} chunks -> {stats['output']} "
+        f"(exact: {stats['exact_duplicates']}, near: {stats['near_duplicates']})"
+    )
+    return unique, stats
@@ -1,16 +1,23 @@
-from typing import List, Dict
+import re
+from bisect import bisect_right
+from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
 from pathlib import Path
-from PyPDF2 import PdfReader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
+from .pdf_extract import get_backend, PageTextCache, extract_pages_cached
 import logging
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def load_pdf_documents(docs_path: str) -> List[Document]:
-    """PDF 문서들을 로드하고 LangChain Document 객체로 변환합니다."""
+def load_pdf_documents(docs_path: str, backend: str = "pypdf2", cache_dir: Optional[str] = None) -> List[Document]:
+    """PDF 문서들을 로드하고 LangChain Document 객체로 변환합니다.
+
+    cache_dir를 지정하면 파일 해시별로 추출한 페이지 텍스트를 저장하고,
+    다음 실행부터는 PDF를 다시 파싱하지 않고 캐시를 사용합니다.
+    """
     documents = []
     docs_dir = Path(docs_path)
     
@@ -18,41 +25,50 @@ def load_pdf_documents(docs_path: str) -> List[Document]:
         logger.error(f"Documents directory does not exist: {docs_path}")
         return documents
     
-    pdf_files = list(docs_dir.glob("*.pdf"))
+    pdf_files = sorted(docs_dir.glob("*.pdf"))
     logger.info(f"Found {len(pdf_files)} PDF files")
     
+    extractor = get_backend(backend)
+    cache = PageTextCache(cache_dir) if cache_dir else None
+    
     successful_loads = 0
     failed_loads = 0
+    cache_hits = 0
     
     for i, pdf_path in enumerate(pdf_files):
         try:
             logger.info(f"Loading PDF {i+1}/{len(pdf_files)}: {pdf_path.name}")
             
-            reader = PdfReader(str(pdf_path))
+            extracted = extract_pages_cached(pdf_path, extractor, cache)
+            pages = extracted["pages"]
+            cache_hits += extracted["cached"]
+            
+            # 각 페이지 텍스트를 이어 붙이면서 페이지 시작 위치를 기록
             text = ""
+            page_starts = []
+            for page_num, page_text in enumerate(pages):
+                if page_text:
+                    page_starts.append((len(text), page_num + 1))
+                    text += page_text + "\n"
             
-            # 각 페이지에서 텍스트 추출
-            for page_num, page in enumerate(reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                except Exception as e:
-                    logger.warning(f"Failed to extract text from page {page_num} of {pdf_path.name}: {e}")
-                    continue
+            leading = len(text) - len(text.lstrip())
+            text = text.strip()
             
-            if text.strip():
+            if text:
                 doc = Document(
-                    page_content=text.strip(),
+                    page_content=text,
                     metadata={
                         "source": pdf_path.name,
                         "file_path": str(pdf_path),
-                        "pages": len(reader.pages)
+                        "file_hash": extracted["file_hash"],
+                        "pages": len(pages),
+                        # Chroma 메타데이터는 스칼라만 허용하므로 "오프셋:페이지" 문자열로 저장
+                        "page_starts": ",".join(f"{max(0, offset - leading)}:{page}" for offset, page in page_starts)
                     }
                 )
                 documents.append(doc)
                 successful_loads += 1
-                logger.info(f"✅ Successfully loaded {pdf_path.name} ({len(reader.pages)} pages)")
+                logger.info(f"✅ Successfully loaded {pdf_path.name} ({len(pages)} pages{', cached' if extracted['cached'] else ''})")
             else:
                 logger.warning(f"⚠️  No text extracted from {pdf_path.name}")
                 failed_loads += 1
@@ -61,9 +77,46 @@ def load_pdf_documents(docs_path: str) -> List[Document]:
             logger.error(f"❌ Error loading {pdf_path.name}: {e}")
             failed_loads += 1
     
-    logger.info(f"📊 Loading Summary: {successful_loads} successful, {failed_loads} failed")
+    logger.info(f"📊 Loading Summary: {successful_loads} successful, {failed_loads} failed, {cache_hits} from cache")
     return documents
 
+def assign_pages(doc: Document, chunks: List[Document]) -> List[Document]:
+    """원본 문서의 page_starts를 이용해 각 청크의 시작 페이지를 기록합니다.
+
+    청크 metadata에 원문 시작 위치(start_index)가 있으면 그대로 사용하고,
+    없으면 청크 앞부분의 줄을 원문에서 찾아 위치를 결정합니다.
+    """
+    page_starts = doc.metadata.get("page_starts")
+    offsets, page_numbers = [], []
+    for entry in page_starts.split(",") if page_starts else []:
+        offset, page = entry.split(":")
+        offsets.append(int(offset))
+        page_numbers.append(int(page))
+
+    cursor = 0
+    for chunk in chunks:
+        chunk.metadata.pop("page_starts", None)
+        start_index = chunk.metadata.pop("start_index", None)
+        if not offsets:
+            continue
+        if start_index is not None:
+            cursor = start_index
+        else:
+            cursor = _find_chunk_start(doc.page_content, chunk.page_content, cursor)
+        chunk.metadata["page"] = page_numbers[max(0, bisect_right(offsets, cursor) - 1)]
+    return chunks
+
+def _find_chunk_start(text: str, chunk_text: str, cursor: int) -> int:
+    """청크 앞부분의 줄을 직전 청크 근처에서 먼저 찾고, 없으면 cursor 이후 전체에서 찾습니다."""
+    window_end = cursor + 4 * len(chunk_text) + 1000
+    lines = [line for line in chunk_text.splitlines()[:3] if line.strip()]
+    for end in (window_end, len(text)):
+        for line in lines:
+            position = text.find(line, cursor, end)
+            if position >= 0:
+                return position
+    return cursor
+
 def split_documents(documents: List[Document], chunk_size: int, chunk_overlap: int) -> List[Document]:
     """문서를 청크로 분할합니다."""
     logger.info(f"Splitting {len(documents)} documents into chunks (size: {chunk_size}, overlap: {chunk_overlap})")
@@ -78,11 +131,231 @@ def split_documents(documents: List[Document], chunk_size: int, chunk_overlap: i
     all_chunks = []
     for i, doc in enumerate(documents):
         try:
-            doc_chunks = text_splitter.split_documents([doc])
+            doc_chunks = assign_pages(doc, text_splitter.split_documents([doc]))
             all_chunks.extend(doc_chunks)
             logger.info(f"Document {i+1}/{len(documents)} split into {len(doc_chunks)} chunks")
         except Exception as e:
             logger.error(f"Error splitting document {i+1}: {e}")
     
     logger.info(f"✅ Total chunks created: {len(all_chunks)}")
-    return all_chunks 
\ No newline at end of file
+    return all_chunks 
+
+# 보험 약관 구조 패턴
+ARTICLE_PATTERN = re.compile(
+    r"^\s*제\s*(\d+)\s*조(?:\s*의\s*(\d+))?(?![가-힣0-9])\s*"
+    r"(?:[(（\[【]\s*([^)）\]】]{1,60})\s*[)）\]】]?|(?!제)(\S[^\n]{0,40}))?"
+)
+CHAPTER_PATTERN = re.compile(r"^\s*(제\s*\d+\s*[관장절편])\s*(.{0,40})$")
+CLAUSE_PATTERN = re.compile(r"^\s*[①-⑳]")  # ①~⑳ (항)
+# 목차 줄 (점 리더 또는 줄 끝 쪽 번호, 예: "제3조 【보험금의 지급사유】 ........", "... p23")
+TOC_LINE_PATTERN = re.compile(r"(?:\.{4,}|…{2,}|·{4,})|\s{2,}p\.?\s*\d+\s*$")
+NUMERIC_CELL_PATTERN = re.compile(r"^[\d,.%()\-~]+$")
+
+def _is_table_row(line: str) -> bool:
+    """숫자 셀이 3개 이상이고 절반 가까이를 차지하는 줄을 표의 행으로 봅니다."""
+    cells = line.split()
+    numeric = sum(1 for cell in cells if NUMERIC_CELL_PATTERN.match(cell) and any(c.isdigit() for c in cell))
+    return numeric >= 3 and numeric * 2 >= len(cells) - 1
+
+@lru_cache()
+def _get_encoding():
+    import tiktoken
+    return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str) -> int:
+    """임베딩 모델 기준 토큰 수를 계산합니다."""
+    return len(_get_encoding().encode(text))
+
+def _split_blocks(text: str) -> List[Tuple[str, str, int]]:
+    """본문을 (블록 종류, 텍스트, 원문 시작 위치) 목록으로 분리합니다. 종류: chapter, article, clause, table, toc, text"""
+    blocks: List[Tuple[str, List[str], int]] = []
+
+    offset = 0
+    for raw_line in text.splitlines(keepends=True):
+        line = raw_line.splitlines()[0]
+        line_start = offset
+        offset += len(raw_line)
+        if not line.strip():
+            continue
+
+        if TOC_LINE_PATTERN.search(line):
+            kind = "toc"
+        elif CHAPTER_PATTERN.match(line):
+            kind = "chapter"
+        elif ARTICLE_PATTERN.match(line):
+            kind = "article"
+        elif CLAUSE_PATTERN.match(line):
+            kind = "clause"
+        elif _is_table_row(line):
+            kind = "table"
+        else:
+            kind = None
+
+        if kind in ("chapter", "article", "clause"):
+            blocks.append((kind, [line], line_start))
+        elif kind in ("table", "toc"):
+            # 연속된 표 행/목차 줄은 하나의 블록으로 묶음
+            if blocks and blocks[-1][0] == kind:
+                blocks[-1][1].append(line)
+            else:
+                blocks.append((kind, [line], line_start))
+        elif blocks and blocks[-1][0] not in ("chapter", "table", "toc"):
+            # 호(1. 2.)와 일반 줄은 직전 블록에 이어 붙임
+            blocks[-1][1].append(line)
+        else:
+            blocks.append(("text", [line], line_start))
+
+    # 본문 없이 다음 조문 제목이나 목차가 바로 이어지는 조문 제목은 점 리더 없는 목차 항목으로 봄
+    merged: List[Tuple[str, List[str], int]] = []
+    for i, (kind, lines, start) in enumerate(blocks):
+        if kind == "article" and len(lines) == 1 and i + 1 < len(blocks) and blocks[i + 1][0] in ("article", "toc"):
+            kind = "toc"
+        if kind == "toc" and merged and merged[-1][0] == "toc":
+            merged[-1][1].extend(lines)
+        else:
+            merged.append((kind, lines, start))
+
+    return [(kind, "\n".join(lines), start) for kind, lines, start in merged]
+
+def _parse_article(line: str) -> Dict[str, str]:
+    match = ARTICLE_PATTERN.match(line)
+    number = match.group(1)
+    if match.group(2):
+        number = f"{number}의{match.group(2)}"
+    # PyPDF2가 넣는 이중 공백 정리
+    title = " ".join((match.group(3) or match.group(4) or "").split())
+    return {"article_no": number, "article_title": title}
+
+def _build_sections(text: str) -> List[Dict]:
+    """블록을 조문 단위 섹션으로 묶습니다."""
+    sections: List[Dict] = []
+    chapter: Optional[str] = None
+    current: Dict = {"meta": {}, "units": [], "header": ""}
+
+    for kind, block, start in _split_blocks(text):
+        if kind == "chapter":
+            match = CHAPTER_PATTERN.match(block)
+            chapter = " ".join(part.strip() for part in match.groups() if part and part.strip())
+            continue
+
+        if kind == "article":
+            if current["units"]:
+                sections.append(current)
+            header = block.splitlines()[0].strip()
+            meta = _parse_article(header)
+            if chapter:
+                meta["chapter"] = chapter
+            current = {"meta": meta, "units": [("article", block, start)], "header": header}
+            continue
+
+        if kind == "toc" and current["header"]:
+            # 목차는 직전 조문에 속하지 않도록 별도 섹션으로 분리
+            sections.append(current)
+            current = {"meta": {}, "units": [], "header": ""}
+
+        if not current["units"] and chapter:
+            current["meta"] = {"chapter": chapter}
+        current["units"].append((kind, block, start))
+
+    if current["units"]:
+        sections.append(current)
+    return sections
+
+def split_documents_by_structure(documents: List[Document], max_tokens: int, overlap_tokens: int = 0) -> List[Document]:
+    """약관의 조/항/호와 표 경계를 유지하며 토큰 기준으로 청크를 분할합니다."""
+    logger.info(f"Splitting {len(documents)} documents by structure (max tokens: {max_tokens})")
+
+    # 한 단위가 max_tokens를 넘을 때만 사용하는 보조 분할기
+    fallback_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=max_tokens,
+        chunk_overlap=overlap_tokens,
+        length_function=count_tokens,
+        separators=["\n", ".", " ", ""]
+    )
+
+    all_chunks = []
+    for i, doc in enumerate(documents):
+        try:
+            doc_chunks = []
+            for section in _build_sections(doc.page_content):
+                header = section["header"]
+                section_meta = {**doc.metadata, **section["meta"]}
+
+                def emit(units: List[Tuple[str, str, int]]):
+                    if header:
+                        chunk_type = "article"
+                    elif all(kind == "table" for kind, _, _ in units):
+                        chunk_type = "table"
+                    elif all(kind == "toc" for kind, _, _ in units):
+                        chunk_type = "toc"
+                    else:
+                        chunk_type = "text"
+
+                    text = "\n".join(unit for _, unit, _ in units)
+                    # 조문 중간부터 시작하는 청크에는 조문 제목을 앞에 붙여 문맥을 유지
+                    if header and not text.startswith(header):
+                        text = f"{header}\n{text}"
+
+                    doc_chunks.append(Document(
+                        page_content=text,
+                        metadata={
+                            **section_meta,
+                            "chunk_type": chunk_type,
+                            "token_count": count_tokens(text),
+                            # 페이지 계산용 원문 시작 위치 (assign_pages에서 제거됨)
+                            "start_index": units[0][2]
+                        }
+                    ))
+
+                def flush(units: List[Tuple[str, str, int]]):
+                    # 조문 제목만 남은 경우 다음 청크 앞에 제목이 붙으므로 따로 내보내지 않음
+                    if not (len(units) == 1 and units[0][0] == "article"):
+                        emit(units)
+
+                buffer: List[Tuple[str, str, int]] = []
+                buffer_tokens = 0
+
+                for kind, unit, start in section["units"]:
+                    unit_tokens = count_tokens(unit)
+
+                    # 단일 항/표가 너무 길면 토큰 기준으로 나눔
+                    if unit_tokens > max_tokens:
+                        if buffer:
+                            flush(buffer)
+                            buffer, buffer_tokens = [], 0
+                        search_from = 0
+                        for piece in fallback_splitter.split_text(unit):
+                            position = unit.find(piece, search_from)
+                            if position >= 0:
+                                search_from = position + 1
+                            emit([(kind, piece, start + max(0, search_from - 1))])
+                        continue
+
+                    # 줄바꿈 구분자(1토큰)를 포함해 한도를 넘으면 새 청크 시작
+                    if buffer and buffer_tokens + unit_tokens + 1 > max_tokens:
+                        flush(buffer)
+                        buffer, buffer_tokens = [], 0
+
+                    buffer.append((kind, unit, start))
+                    buffer_tokens += unit_tokens + 1
+
+                if buffer:
+                    emit(buffer)
+
+            all_chunks.extend(assign_pages(doc, doc_chunks))
+            logger.info(f"Document {i+1}/{len(documents)} split into {len(doc_chunks)} chunks")
+        except Exception as e:
+            logger.error(f"Error splitting document {i+1}: {e}")
+
+    logger.info(f"✅ Total chunks created: {len(all_chunks)}")
+    return all_chunks
+
+def chunk_documents(documents: List[Document], settings) -> List[Document]:
+    """설정된 분할 전략(chunk_strategy)에 따라 문서를 청크로 분할합니다."""
+    if settings.chunk_strategy == "structure":
+        return split_documents_by_structure(
+            documents,
+            max_tokens=settings.chunk_tokens,
+            overlap_tokens=settings.chunk_overlap_tokens
+        )
+    return split_documents(documents, settings.chunk_size, settings.chunk_overlap)
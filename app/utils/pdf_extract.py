@@ -0,0 +1,126 @@
+import os
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+class PdfTextBackend:
+    """PDF 페이지별 텍스트 추출 백엔드 인터페이스"""
+
+    name = "base"
+
+    def extract_pages(self, pdf_path: Path) -> List[str]:
+        raise NotImplementedError
+
+class PyPDF2Backend(PdfTextBackend):
+    name = "pypdf2"
+
+    def extract_pages(self, pdf_path: Path) -> List[str]:
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(str(pdf_path))
+        pages = []
+        for page_num, page in enumerate(reader.pages):
+            try:
+                pages.append(page.extract_text() or "")
+            except Exception as e:
+                logger.warning(f"Failed to extract text from page {page_num} of {pdf_path.name}: {e}")
+                pages.append("")
+        return pages
+
+class PyMuPDFBackend(PdfTextBackend):
+    """PyMuPDF 기반 백엔드 - PyPDF2보다 빠르고 메모리 사용량이 적음"""
+
+    name = "pymupdf"
+
+    def __init__(self):
+        import pymupdf  # noqa: F401  (설치 여부 확인)
+
+    def extract_pages(self, pdf_path: Path) -> List[str]:
+        import pymupdf
+
+        pages = []
+        with pymupdf.open(str(pdf_path)) as doc:
+            for page_num, page in enumerate(doc):
+                try:
+                    pages.append(page.get_text("text", sort=True) or "")
+                except Exception as e:
+                    logger.warning(f"Failed to extract text from page {page_num} of {pdf_path.name}: {e}")
+                    pages.append("")
+        return pages
+
+BACKENDS: Dict[str, Type[PdfTextBackend]] = {
+    PyPDF2Backend.name: PyPDF2Backend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+}
+
+def get_backend(name: str) -> PdfTextBackend:
+    """이름으로 백엔드를 생성합니다. 사용할 수 없으면 PyPDF2로 대체합니다."""
+    backend_cls = BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"Unknown PDF backend '{name}'. Available: {', '.join(BACKENDS)}")
+    try:
+        return backend_cls()
+    except ImportError as e:
+        logger.warning(f"⚠️ PDF backend '{name}' is not installed, falling back to pypdf2: {e}")
+        return PyPDF2Backend()
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class PageTextCache:
+    """파일 해시별 페이지 텍스트 캐시 (gzip 압축 JSONL, 한 줄에 한 페이지)"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, file_hash: str, backend: str) -> Path:
+        return self.cache_dir / f"{file_hash}.{backend}.jsonl.gz"
+
+    def get(self, file_hash: str, backend: str) -> Optional[List[str]]:
+        path = self._path(file_hash, backend)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return [json.loads(line)["text"] for line in f]
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring corrupt text cache {path.name}: {e}")
+            return None
+
+    def put(self, file_hash: str, backend: str, pages: List[str]):
+        path = self._path(file_hash, backend)
+        # 임시 파일에 쓴 뒤 교체하여 중단 시에도 손상된 캐시가 남지 않도록 함
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                for page_num, text in enumerate(pages):
+                    f.write(json.dumps({"page": page_num + 1, "text": text}, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+def extract_pages_cached(pdf_path: Path, backend: PdfTextBackend, cache: Optional[PageTextCache] = None) -> Dict:
+    """캐시가 있으면 재사용하고, 없으면 추출 후 캐시에 저장합니다."""
+    file_hash = file_sha256(pdf_path)
+    if cache is not None:
+        pages = cache.get(file_hash, backend.name)
+        if pages is not None:
+            return {"pages": pages, "file_hash": file_hash, "cached": True}
+
+    pages = backend.extract_pages(pdf_path)
+    if cache is not None:
+        cache.put(file_hash, backend.name, pages)
+    return {"pages": pages, "file_hash": file_hash, "cached": False}
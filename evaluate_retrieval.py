@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+검색 파라미터 평가 스크립트
+라벨링된 질문 세트로 청크 분할/검색 설정 조합별 recall@k, MRR,
+평균 프롬프트 토큰 수, 검색 지연 시간을 측정합니다.
+
+임베딩은 디스크 캐시(settings.embedding_cache_path)를 사용하고
+검색은 로컬 numpy 인덱스로 수행하므로, 한 번 임베딩된 청크는
+다시 OpenAI를 호출하지 않습니다.
+
+사용 예:
+    python3 evaluate_retrieval.py --chunk-tokens 500,700,900 --k 3,5,10
+    python3 evaluate_retrieval.py --strategies recursive --chunk-sizes 300,500 --chunk-overlaps 50,100
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import itertools
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from langchain_openai import OpenAIEmbeddings
+from app.utils.document_loader import load_pdf_documents, split_documents, split_documents_by_structure, count_tokens
+from app.utils.dedup import deduplicate_documents
+from app.core.embedding_cache import EmbeddingCache, CachedEmbeddings
+from app.core.chat_engine import SYSTEM_PROMPT, format_user_message
+from app.core.config import get_settings
+
+# 로깅 설정 (청크 분할 로그가 많으므로 경고 이상만 출력)
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+def is_relevant(text: str, groups: List[List[str]]) -> bool:
+    """한 그룹의 용어가 모두 포함되면 관련 청크로 판단합니다."""
+    return any(all(term in text for term in group) for group in groups)
+
+class LocalIndex:
+    """코사인 유사도 기반 로컬 브루트포스 인덱스"""
+
+    def __init__(self, vectors: List[List[float]]):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.maximum(norms, 1e-12)
+
+    def search(self, vector: List[float], k: int) -> List[int]:
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])].tolist()
+
+def build_configs(args) -> List[Dict]:
+    configs = []
+    for strategy in args.strategies.split(","):
+        if strategy == "structure":
+            for tokens, overlap in itertools.product(parse_ints(args.chunk_tokens), parse_ints(args.overlap_tokens)):
+                configs.append({"strategy": "structure", "chunk_tokens": tokens, "overlap_tokens": overlap})
+        elif strategy == "recursive":
+            for size, overlap in itertools.product(parse_ints(args.chunk_sizes), parse_ints(args.chunk_overlaps)):
+                configs.append({"strategy": "recursive", "chunk_size": size, "chunk_overlap": overlap})
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+    return configs
+
+def chunk(documents, config: Dict):
+    if config["strategy"] == "structure":
+        return split_documents_by_structure(documents, config["chunk_tokens"], config["overlap_tokens"])
+    return split_documents(documents, config["chunk_size"], config["chunk_overlap"])
+
+def evaluate_config(documents, questions, question_vectors, embeddings: CachedEmbeddings, config: Dict, ks: List[int], dedup: bool, near_threshold: int) -> List[Dict]:
+    chunks = chunk(documents, config)
+    if dedup:
+        # vectorize_documents.py와 같은 설정으로 중복 제거
+        chunks, _ = deduplicate_documents(chunks, near_threshold=near_threshold)
+    texts = [c.page_content for c in chunks]
+
+    misses_before = embeddings.misses
+    index_start = time.time()
+    index = LocalIndex(embeddings.embed_documents(texts))
+    index_seconds = time.time() - index_start
+    new_embeddings = embeddings.misses - misses_before
+
+    system_tokens = count_tokens(SYSTEM_PROMPT)
+    max_k = max(ks)
+    rankings = []
+    search_ms = []
+    for vector in question_vectors:
+        start = time.perf_counter()
+        rankings.append(index.search(vector, max_k))
+        search_ms.append((time.perf_counter() - start) * 1000)
+
+    results = []
+    for k in ks:
+        hits, reciprocal_ranks, prompt_tokens = 0, [], []
+        for item, ranking in zip(questions, rankings):
+            top = ranking[:k]
+            relevant_ranks = [rank for rank, idx in enumerate(top) if is_relevant(texts[idx], item["relevant"])]
+            hits += bool(relevant_ranks)
+            reciprocal_ranks.append(1.0 / (relevant_ranks[0] + 1) if relevant_ranks else 0.0)
+
+            context = "\n\n".join(texts[idx] for idx in top)
+            prompt_tokens.append(system_tokens + count_tokens(format_user_message(item["question"], context)))
+
+        results.append({
+            **config,
+            "dedup": dedup,
+            "k": k,
+            "chunks": len(chunks),
+            "new_embeddings": new_embeddings,
+            "index_seconds": round(index_seconds, 2),
+            "recall_at_k": round(hits / len(questions), 3),
+            "mrr": round(sum(reciprocal_ranks) / len(questions), 3),
+            "avg_prompt_tokens": round(sum(prompt_tokens) / len(prompt_tokens)),
+            "avg_search_ms": round(sum(search_ms) / len(search_ms), 3),
+        })
+    return results
+
+def print_table(rows: List[Dict]):
+    columns = ["strategy", "size", "overlap", "k", "chunks", "recall@k", "MRR", "prompt_tok", "search_ms"]
+    print(" | ".join(f"{c:>10}" for c in columns))
+    print("-" * (13 * len(columns)))
+    for row in rows:
+        size = row.get("chunk_tokens", row.get("chunk_size"))
+        overlap = row.get("overlap_tokens", row.get("chunk_overlap"))
+        values = [row["strategy"], size, overlap, row["k"], row["chunks"], row["recall_at_k"],
+                  row["mrr"], row["avg_prompt_tokens"], row["avg_search_ms"]]
+        print(" | ".join(f"{str(v):>10}" for v in values))
+
+def main():
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="검색 파라미터 평가")
+    parser.add_argument("--questions", default="eval/questions.json", help="라벨링된 질문 세트 (JSON)")
+    parser.add_argument("--strategies", default="structure,recursive", help="청크 분할 전략 목록")
+    parser.add_argument("--chunk-tokens", default="500,700,900", help="structure 전략 청크 토큰 수 목록")
+    parser.add_argument("--overlap-tokens", default=str(settings.chunk_overlap_tokens))
+    parser.add_argument("--chunk-sizes", default="300,500,800", help="recursive 전략 청크 글자 수 목록")
+    parser.add_argument("--chunk-overlaps", default=str(settings.chunk_overlap))
+    parser.add_argument("--k", default="3,5,10", help="검색 개수(k) 목록")
+    parser.add_argument("--no-dedup", action="store_true", help="중복 청크 제거를 생략 (settings.dedup_enabled가 false여도 생략)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    with open(args.questions, encoding="utf-8") as f:
+        questions = json.load(f)
+    ks = parse_ints(args.k)
+
+    print("🔍 검색 파라미터 평가 시작")
+    print(f"📋 질문 {len(questions)}개, k={ks}")
+
+    documents = load_pdf_documents(
+        settings.documents_path,
+        backend=settings.pdf_backend,
+        cache_dir=settings.extraction_cache_path
+    )
+    if not documents:
+        print("❌ 로드된 문서가 없습니다!")
+        return False
+
+    embeddings = CachedEmbeddings(
+        OpenAIEmbeddings(openai_api_key=settings.openai_api_key, model=settings.openai_embedding_model),
+        EmbeddingCache(settings.embedding_cache_path, settings.openai_embedding_model)
+    )
+    question_vectors = embeddings.embed_documents([item["question"] for item in questions])
+
+    rows = []
+    for config in build_configs(args):
+        print(f"\n⚙️  {config}")
+        rows.extend(evaluate_config(
+            documents, questions, question_vectors, embeddings, config, ks,
+            dedup=settings.dedup_enabled and not args.no_dedup,
+            near_threshold=settings.dedup_near_threshold
+        ))
+
+    print("\n📊 평가 결과")
+    print_table(rows)
+    print(f"\n💾 임베딩 캐시: {embeddings.hits} hit, {embeddings.misses} miss")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"✅ 결과 저장: {args.output}")
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+부하 테스트 스크립트
+기록된 질문(JSONL)을 개방형(open-loop) 도착 패턴으로 /api/chat/question에 재생하고
+시간 구간별 지연 시간 백분위수, 오류율, 포화 지점을 보고합니다.
+
+요청은 이전 응답을 기다리지 않고 도착 시각에 맞춰 전송되므로,
+서버가 처리 한계를 넘으면 대기열과 지연 시간이 그대로 드러납니다.
+
+실행 방식:
+    # 앱을 같은 프로세스에서 ASGI로 호출 (OpenAI는 지연 시간을 흉내 내는 스텁으로 대체)
+    python3 load_test.py --rate 5 --duration 30
+
+    # 요청률을 단계적으로 올리며 포화 지점 탐색
+    python3 load_test.py --rates 1,2,4,8,16 --duration 20 --slo-ms 5000
+
+    # 스텁 OpenAI로 로컬 서버 실행 후 다른 터미널에서 HTTP로 부하 주입
+    python3 load_test.py --serve --port 8001
+    python3 load_test.py --url http://localhost:8001 --arrival burst --rate 2 --burst-size 20
+
+입력 JSONL은 한 줄에 하나의 요청이며 --field(기본값: question) 필드를 질문으로 사용합니다.
+context_count, rerank, tenant 등 나머지 필드는 요청 본문에 그대로 전달됩니다.
+질문이 있는 줄이 없으면 eval/questions.json의 질문을 사용합니다.
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+QUESTION_PATH = "/api/chat/question"
+
+# ---------------------------------------------------------------------------
+# OpenAI 스텁
+# ---------------------------------------------------------------------------
+
+def load_test_keys(count: int) -> List[str]:
+    return [f"load-test-{i}" for i in range(count)]
+
+def register_api_keys(keys: List[str]):
+    """부하 테스트용 API 키를 허용 목록(API_KEYS)에 추가합니다 (설정 로드 전에 호출)."""
+    existing = [key for key in os.environ.get("API_KEYS", "").split(",") if key]
+    os.environ["API_KEYS"] = ",".join(existing + keys)
+
+def install_openai_stubs(llm_ms: float, embed_ms: float):
+    """OpenAI 호출을 지연 시간만 흉내 내는 스텁으로 교체합니다 (앱 import 전에 호출)."""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-load-test")
+
+    from langchain.schema import AIMessage
+    from langchain.schema.output import ChatGeneration, LLMResult
+    import app.core.vector_store as vector_store_module
+    from app.core.config import get_settings
+
+    dimensions = get_settings().embedding_dimensions
+
+    class StubEmbeddings:
+        def __init__(self, **kwargs):
+            pass
+
+        def embed_documents(self, texts: List[str]) -> List[List[float]]:
+            time.sleep(embed_ms / 1000)
+            vectors = []
+            for text in texts:
+                # 같은 텍스트는 같은 벡터가 나오도록 해시 기반으로 생성
+                rng = random.Random(hashlib.sha1(text.encode("utf-8")).digest())
+                vectors.append([rng.uniform(-1, 1) for _ in range(dimensions)])
+            return vectors
+
+        def embed_query(self, text: str) -> List[float]:
+            return self.embed_documents([text])[0]
+
+    class StubLLM:
+        def generate(self, message_batches, **kwargs) -> LLMResult:
+            # 실제 GPT-4 응답 시간처럼 꼬리가 긴 로그정규 분포로 지연
+            time.sleep(random.lognormvariate(math.log(llm_ms / 1000), 0.35))
+            prompt_chars = sum(len(m.content) for m in message_batches[0])
+            return LLMResult(
+                generations=[[ChatGeneration(message=AIMessage(content="[stub] 부하 테스트 응답입니다."))]],
+                llm_output={"token_usage": {
+                    "prompt_tokens": prompt_chars // 2,
+                    "completion_tokens": 20,
+                    "total_tokens": prompt_chars // 2 + 20,
+                }}
+            )
+
+    vector_store_module.OpenAIEmbeddings = StubEmbeddings
+    from app.api import chat
+    chat.chat_engine.llm = StubLLM()
+
+# ---------------------------------------------------------------------------
+# 요청 로드 / 도착 패턴
+# ---------------------------------------------------------------------------
+
+def load_requests(path: str, field: str) -> List[Dict]:
+    payloads = []
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get(field):
+                    payload = {k: v for k, v in record.items() if k != field}
+                    payload["question"] = record[field]
+                    payloads.append(payload)
+
+    if not payloads:
+        print(f"⚠️  '{path}'에서 '{field}' 필드가 있는 요청을 찾지 못해 eval/questions.json을 사용합니다.")
+        with open(project_root / "eval" / "questions.json", encoding="utf-8") as f:
+            payloads = [{"question": item["question"]} for item in json.load(f)]
+    return payloads
+
+def arrival_times(args, rate: float) -> List[float]:
+    """실행 시작 기준 요청 전송 시각(초) 목록"""
+    times: List[float] = []
+    if args.arrival == "constant":
+        times = [i / rate for i in range(int(rate * args.duration))]
+    elif args.arrival == "poisson":
+        t = random.expovariate(rate)
+        while t < args.duration:
+            times.append(t)
+            t += random.expovariate(rate)
+    elif args.arrival == "burst":
+        # rate 기준 포아송 배경 부하 + burst_interval마다 burst_size개 동시 도착
+        times = arrival_times(argparse.Namespace(**{**vars(args), "arrival": "poisson"}), rate) if rate > 0 else []
+        t = args.burst_interval / 2
+        while t < args.duration:
+            times.extend([t] * args.burst_size)
+            t += args.burst_interval
+    return sorted(times)
+
+# ---------------------------------------------------------------------------
+# 실행 / 집계
+# ---------------------------------------------------------------------------
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_step(client: httpx.AsyncClient, payloads: List[Dict], schedule: List[float], args) -> List[Dict]:
+    results: List[Dict] = []
+    in_flight = 0
+    tasks = []
+    api_keys = load_test_keys(args.api_keys)
+
+    async def send(payload: Dict, scheduled: float, api_key: str):
+        nonlocal in_flight
+        in_flight += 1
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                QUESTION_PATH,
+                json=payload,
+                headers={"X-API-Key": api_key},
+                timeout=args.timeout
+            )
+            status = response.status_code
+        except httpx.TimeoutException:
+            status = "timeout"
+        except Exception as e:
+            status = type(e).__name__
+        finally:
+            in_flight -= 1
+        results.append({
+            "scheduled": scheduled,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "status": status,
+        })
+
+    started = time.perf_counter()
+    for i, scheduled in enumerate(schedule):
+        delay = scheduled - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # 부하 생성기 자체가 무너지지 않도록 동시 요청 수 상한
+        if in_flight >= args.max_in_flight:
+            results.append({"scheduled": scheduled, "latency_ms": 0.0, "status": "client_dropped"})
+            continue
+        payload = dict(payloads[i % len(payloads)])
+        if args.unique_questions:
+            # 동일 질문 병합(single-flight)을 피해 모든 요청이 실제로 처리되도록 함
+            payload["question"] = f"{payload['question']} ({i})"
+        api_key = api_keys[i % len(api_keys)]
+        tasks.append(asyncio.create_task(send(payload, scheduled, api_key)))
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return results
+
+def summarize(results: List[Dict], duration: float, window: float = 0) -> Dict:
+    ok = [r["latency_ms"] for r in results if r["status"] == 200]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["status"] != 200:
+            errors[str(r["status"])] = errors.get(str(r["status"]), 0) + 1
+    total = len(results)
+    return {
+        "requests": total,
+        "offered_rps": round(total / duration, 2) if duration else 0.0,
+        "goodput_rps": round(len(ok) / duration, 2) if duration else 0.0,
+        "error_rate": round((total - len(ok)) / total, 4) if total else 0.0,
+        "errors": errors,
+        "p50_ms": round(percentile(ok, 50)),
+        "p90_ms": round(percentile(ok, 90)),
+        "p99_ms": round(percentile(ok, 99)),
+        "max_ms": round(max(ok)) if ok else 0,
+    }
+
+def print_windows(results: List[Dict], duration: float, window: float):
+    print(f"   {'구간(s)':>9} | {'요청':>5} | {'p50':>7} | {'p90':>7} | {'p99':>7} | {'오류율':>6}")
+    buckets = max(1, math.ceil(duration / window))
+    for b in range(buckets):
+        rows = [r for r in results if b * window <= r["scheduled"] < (b + 1) * window]
+        if not rows:
+            continue
+        s = summarize(rows, window)
+        print(f"   {b * window:>4.0f}-{(b + 1) * window:<4.0f} | {s['requests']:>5} | {s['p50_ms']:>7} | "
+              f"{s['p90_ms']:>7} | {s['p99_ms']:>7} | {s['error_rate']:>6.1%}")
+
+def is_saturated(summary: Dict, args) -> bool:
+    """SLO(p99) 초과, 오류율 초과, 또는 처리량이 요청률을 따라가지 못하면 포화로 판단"""
+    return (
+        summary["p99_ms"] > args.slo_ms
+        or summary["error_rate"] > args.max_error_rate
+        or summary["goodput_rps"] < 0.9 * summary["offered_rps"]
+    )
+
+async def run(args) -> List[Dict]:
+    payloads = load_requests(args.input, args.field)
+    rates = [float(r) for r in args.rates.split(",")] if args.rates else [args.rate]
+
+    if args.url:
+        # 대상 서버의 API_KEYS에 load-test-0 ~ load-test-{N-1} 키가 등록되어 있어야 함 (--serve는 자동 등록)
+        client = httpx.AsyncClient(base_url=args.url, limits=httpx.Limits(max_connections=args.max_in_flight))
+    else:
+        register_api_keys(load_test_keys(args.api_keys))
+        if not args.no_stub:
+            install_openai_stubs(args.stub_llm_ms, args.stub_embed_ms)
+        from app.main import app
+        # 요청마다 남는 거부/경고 로그가 결과 표를 가리지 않도록 함
+        logging.getLogger("app").setLevel(logging.ERROR)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test")
+
+    print(f"🎯 대상: {args.url or 'in-process ASGI' + ('' if args.no_stub else ' (stub OpenAI)')}")
+    print(f"📋 질문 {len(payloads)}개, 도착 패턴: {args.arrival}, 구간 길이: {args.duration}s")
+
+    steps = []
+    saturation_rate: Optional[float] = None
+    async with client:
+        for rate in rates:
+            schedule = arrival_times(args, rate)
+            print(f"\n🚀 요청률 {rate} rps ({len(schedule)}건)")
+            results = await run_step(client, payloads, schedule, args)
+            summary = summarize(results, args.duration)
+            print_windows(results, args.duration, args.window)
+            print(f"   ▶ goodput {summary['goodput_rps']} rps, p50 {summary['p50_ms']}ms, "
+                  f"p99 {summary['p99_ms']}ms, 오류율 {summary['error_rate']:.1%} {summary['errors']}")
+
+            saturated = is_saturated(summary, args)
+            steps.append({"rate": rate, "saturated": saturated, **summary})
+            if saturated and saturation_rate is None:
+                saturation_rate = rate
+                print(f"   ⚠️  포화 (SLO p99 {args.slo_ms}ms, 최대 오류율 {args.max_error_rate:.0%})")
+                if args.stop_on_saturation:
+                    break
+
+    print("\n📊 요약")
+    print(f"   {'rps':>6} | {'goodput':>7} | {'p50':>7} | {'p99':>7} | {'오류율':>6} | 포화")
+    for step in steps:
+        print(f"   {step['rate']:>6} | {step['goodput_rps']:>7} | {step['p50_ms']:>7} | {step['p99_ms']:>7} | "
+              f"{step['error_rate']:>6.1%} | {'yes' if step['saturated'] else 'no'}")
+    if saturation_rate is not None:
+        print(f"\n⚠️  포화 지점: {saturation_rate} rps")
+    else:
+        print("\n✅ 시험한 요청률 범위에서 포화 없음")
+    return steps
+
+def serve(args):
+    """스텁 OpenAI로 로컬 서버를 실행합니다."""
+    import uvicorn
+
+    register_api_keys(load_test_keys(args.api_keys))
+    install_openai_stubs(args.stub_llm_ms, args.stub_embed_ms)
+    from app.main import app
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
+
+def main():
+    parser = argparse.ArgumentParser(description="챗봇 API 부하 테스트")
+    parser.add_argument("--input", default="requests.jsonl", help="재생할 요청 JSONL 파일")
+    parser.add_argument("--field", default="question", help="질문으로 사용할 JSONL 필드")
+    parser.add_argument("--url", help="대상 서버 URL (생략 시 in-process ASGI)")
+    parser.add_argument("--arrival", choices=["poisson", "constant", "burst"], default="poisson")
+    parser.add_argument("--rate", type=float, default=2.0, help="초당 요청 수")
+    parser.add_argument("--rates", help="단계별 요청률 목록 (예: 1,2,4,8)")
+    parser.add_argument("--duration", type=float, default=30.0, help="단계별 실행 시간(초)")
+    parser.add_argument("--burst-size", type=int, default=20)
+    parser.add_argument("--burst-interval", type=float, default=10.0)
+    parser.add_argument("--window", type=float, default=5.0, help="지연 시간 집계 구간(초)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 타임아웃(초)")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--api-keys", type=int, default=100, help="요청에 돌려 쓸 X-API-Key 개수")
+    parser.add_argument("--unique-questions", action="store_true", help="요청마다 질문을 달리해 동일 질문 병합을 비활성화")
+    parser.add_argument("--slo-ms", type=float, default=10000.0, help="포화 판단 p99 기준(ms)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--stop-on-saturation", action="store_true")
+    parser.add_argument("--no-stub", action="store_true", help="in-process 모드에서 실제 OpenAI 사용")
+    parser.add_argument("--stub-llm-ms", type=float, default=3000.0, help="스텁 GPT 응답 지연 중앙값(ms)")
+    parser.add_argument("--stub-embed-ms", type=float, default=150.0, help="스텁 임베딩 지연(ms)")
+    parser.add_argument("--serve", action="store_true", help="스텁 OpenAI로 로컬 서버 실행")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--output", help="단계별 결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return True
+
+    steps = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(steps, f, ensure_ascii=False, indent=2)
+        print(f"✅ 결과 저장: {args.output}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
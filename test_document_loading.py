@@ -9,7 +9,7 @@ from pathlib import Path
 # 현재 디렉토리를 Python path에 추가
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.utils.document_loader import load_pdf_documents, split_documents
+from app.utils.document_loader import load_pdf_documents, chunk_documents
 from app.core.config import get_settings
 
 def test_document_loading():
@@ -21,7 +21,11 @@ def test_document_loading():
     settings = get_settings()
     
     # 문서 로드
-    documents = load_pdf_documents(settings.documents_path)
+    documents = load_pdf_documents(
+        settings.documents_path,
+        backend=settings.pdf_backend,
+        cache_dir=settings.extraction_cache_path
+    )
     
     if not documents:
         print("❌ 문서를 로드할 수 없습니다.")
@@ -40,7 +44,7 @@ def test_document_loading():
     
     # 문서 청크 분할 테스트
     print("\n🔪 문서 청크 분할 테스트")
-    chunks = split_documents(documents, settings.chunk_size, settings.chunk_overlap)
+    chunks = chunk_documents(documents, settings)
     
     if chunks:
         print(f"✅ {len(chunks)}개의 청크를 생성했습니다.")
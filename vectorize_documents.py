@@ -7,14 +7,17 @@ PDF 문서를 로드하고 벡터 임베딩을 생성하여 ChromaDB에 저장
 import sys
 import os
 import logging
+import argparse
 from pathlib import Path
 
 # 프로젝트 루트를 Python path에 추가
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from app.utils.document_loader import load_pdf_documents, split_documents
+from app.utils.document_loader import load_pdf_documents, chunk_documents
+from app.utils.dedup import deduplicate_documents
 from app.core.vector_store import VectorStore
+from app.core.tenants import tenant_path, validate_tenant
 from app.core.config import get_settings
 
 # 로깅 설정
@@ -24,18 +27,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def vectorize_documents():
+def vectorize_documents(tenant=None, documents_path=None):
     """문서를 벡터화하여 ChromaDB에 저장합니다."""
     try:
         settings = get_settings()
+        tenant = validate_tenant(tenant or settings.default_tenant)
+        documents_path = documents_path or settings.documents_path
+        persist_path = tenant_path(tenant, settings)
         
         print("🔄 문서 벡터화 시작...")
-        print(f"📁 문서 폴더: {settings.documents_path}")
-        print(f"🗄️ 벡터 저장소: {settings.vector_store_path}")
+        print(f"🏷️ 테넌트: {tenant}")
+        print(f"📁 문서 폴더: {documents_path}")
+        print(f"🗄️ 벡터 저장소: {persist_path}")
         
         # 1. 문서 로드
         print("\n📖 PDF 문서 로드 중...")
-        documents = load_pdf_documents(settings.documents_path)
+        documents = load_pdf_documents(
+            documents_path,
+            backend=settings.pdf_backend,
+            cache_dir=settings.extraction_cache_path
+        )
         
         if not documents:
             print("❌ 로드된 문서가 없습니다!")
@@ -44,12 +55,8 @@ def vectorize_documents():
         print(f"✅ {len(documents)}개의 문서를 성공적으로 로드했습니다.")
         
         # 2. 문서 청크 분할
-        print("\n✂️  문서 청크 분할...")
-        chunks = split_documents(
-            documents,
-            chunk_size=settings.chunk_size,
-            chunk_overlap=settings.chunk_overlap
-        )
+        print(f"\n✂️  문서 청크 분할 (전략: {settings.chunk_strategy})...")
+        chunks = chunk_documents(documents, settings)
         
         if not chunks:
             print("❌ 청크를 생성할 수 없습니다!")
@@ -57,11 +64,21 @@ def vectorize_documents():
         
         print(f"✅ {len(chunks)}개의 청크를 생성했습니다.")
         
+        # 2-1. 중복 청크 제거 (동일 PDF 사본, 공통 약관 문구)
+        if settings.dedup_enabled:
+            print("\n🧹 중복 청크 제거...")
+            chunks, dedup_stats = deduplicate_documents(
+                chunks,
+                near_threshold=settings.dedup_near_threshold
+            )
+            print(f"✅ 완전 중복 {dedup_stats['exact_duplicates']}개, 유사 중복 {dedup_stats['near_duplicates']}개 제거 → {len(chunks)}개")
+        
         # 3. 벡터 저장소 초기화
         print("\n🔄 벡터 저장소 초기화...")
         vector_store = VectorStore(
             openai_api_key=settings.openai_api_key,
-            collection_name="insurance_docs"
+            collection_name="insurance_docs",
+            persist_path=persist_path
         )
         
         # 4. 문서 벡터화 및 저장 (배치 처리)
@@ -88,5 +105,10 @@ def vectorize_documents():
         return False
 
 if __name__ == "__main__":
-    success = vectorize_documents()
+    parser = argparse.ArgumentParser(description="PDF 문서 벡터화")
+    parser.add_argument("--tenant", help="저장할 테넌트 ID (기본값: settings.default_tenant)")
+    parser.add_argument("--documents", help="PDF 문서 폴더 (기본값: settings.documents_path)")
+    args = parser.parse_args()
+    
+    success = vectorize_documents(tenant=args.tenant, documents_path=args.documents)
     sys.exit(0 if success else 1) 
\ No newline at end of file